@@ -7,22 +7,22 @@ Run:
 
 from __future__ import annotations
 
+import asyncio
 import os
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
 
-from src.react_usc.lc_agent import LangGraphModels, LangGraphReActUSCAgent
-from src.react_usc.lc_vertex import make_chat_vertex_ai
-from src.react_usc.models import AgentConfig, ModelConfig, RetryConfig
-from src.react_usc.plugins import ReflectAndRetryToolPlugin
-from src.react_usc.tools import make_calculator_tool, make_simple_search_tool
-from src.react_usc.test_tools import make_flaky_tool
+# The agent stack is imported inside `main()` so config errors (and `import main`) return quickly.
+if TYPE_CHECKING:
+    from src.react_usc.lc_agent import LangGraphReActUSCAgent
 
 
-def _opt_int_env(name: str) -> int | None:
+def _opt_int_env(name: str, default: int | None = None) -> int | None:
+    # Unset -> `default`; set but empty -> None (provider/model default).
     val = os.getenv(name)
     if val is None:
-        return None
+        return default
     val = val.strip()
     if val == "":
         return None
@@ -30,6 +30,13 @@ def _opt_int_env(name: str) -> int | None:
 
 
 def main() -> None:
+    from src.react_usc.lc_agent import LangGraphModels, LangGraphReActUSCAgent
+    from src.react_usc.lc_vertex import make_chat_vertex_ai, make_raw_vertex
+    from src.react_usc.models import AgentConfig, ModelConfig, RetryConfig
+    from src.react_usc.plugins import ReflectAndRetryToolPlugin
+    from src.react_usc.test_tools import make_flaky_tool
+    from src.react_usc.tools import make_calculator_tool, make_simple_search_tool
+
     # Auto-load .env from repo root (if present). Does not override existing env vars.
     load_dotenv(override=False)
 
@@ -45,12 +52,58 @@ def main() -> None:
         raise RuntimeError("VERTEX_PROJECT_ID is required (set it in your environment).")
 
     # Allow different underlying models for reasoner vs judge.
-    # If REASONER_MODEL_NAME/JUDGE_MODEL_NAME are unset, fall back to VERTEX_MODEL.
+    # If REASONER_MODEL_NAME is unset, fall back to VERTEX_MODEL.
     reasoner_vertex_model = os.getenv("REASONER_MODEL_NAME") or default_vertex_model
-    judge_vertex_model = os.getenv("JUDGE_MODEL_NAME") or default_vertex_model
+    # The judge picks one of K candidates (classification-like), so it defaults to a smaller, faster model.
+    judge_vertex_model = os.getenv("JUDGE_MODEL_NAME") or os.getenv("VERTEX_JUDGE_DEFAULT", "gemini-2.0-flash-lite-001")
 
-    reasoner_lc = make_chat_vertex_ai(model=reasoner_vertex_model, location=location, project=project_id)
-    judge_lc = make_chat_vertex_ai(model=judge_vertex_model, location=location, project=project_id)
+    reasoner_model = ModelConfig(
+        name=reasoner_vertex_model,
+        temperature=float(os.getenv("REASONER_TEMPERATURE", "0.7")),
+        max_tokens=_opt_int_env("REASONER_MAX_TOKENS", 256),
+    )
+    judge_model = ModelConfig(
+        name=judge_vertex_model,
+        temperature=float(os.getenv("JUDGE_TEMPERATURE", "0.0")),
+        max_tokens=_opt_int_env("JUDGE_MAX_TOKENS", 512),
+    )
+    llm_timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "5.0"))
+    if os.getenv("VERTEX_CLIENT", "langchain").strip().lower() == "genai":
+        # Direct google-genai SDK calls (no LangChain callback/message layers per call).
+        reasoner_lc = make_raw_vertex(
+            model=reasoner_model.name,
+            location=location,
+            project=project_id,
+            temperature=reasoner_model.temperature,
+            max_tokens=reasoner_model.max_tokens,
+            timeout=llm_timeout,
+        )
+        judge_lc = make_raw_vertex(
+            model=judge_model.name,
+            temperature=judge_model.temperature,
+            max_tokens=judge_model.max_tokens,
+            # Same SDK client (connection pool) as the reasoner.
+            client=reasoner_lc.client,
+        )
+    else:
+        reasoner_lc = make_chat_vertex_ai(
+            model=reasoner_model.name,
+            location=location,
+            project=project_id,
+            temperature=reasoner_model.temperature,
+            max_tokens=reasoner_model.max_tokens,
+            # Request deadline = the agent's reasoner timeout, so abandoned reasoner calls stop server-side too.
+            timeout=llm_timeout,
+        )
+        judge_lc = make_chat_vertex_ai(
+            model=judge_model.name,
+            location=location,
+            project=project_id,
+            temperature=judge_model.temperature,
+            max_tokens=judge_model.max_tokens,
+            # One gRPC channel (connection pool) for both models: the judge reuses the reasoner's client.
+            client=reasoner_lc.prediction_client,
+        )
 
     config = AgentConfig(
         system_prompt=(
@@ -58,26 +111,35 @@ def main() -> None:
             "Use tools when they meaningfully reduce uncertainty or improve correctness.\n"
             "Prefer minimal tool use; do not call tools if you can answer directly.\n"
             "When calling a tool, make arguments valid and minimal.\n"
+            "Answer in at most 40 words unless the user asks for more detail.\n"
         ),
         k_paths=4,
         max_steps=6,
-        reasoner_model=ModelConfig(
-            name=reasoner_vertex_model,
-            temperature=float(os.getenv("REASONER_TEMPERATURE", "0.7")),
-            max_tokens=_opt_int_env("REASONER_MAX_TOKENS"),
-        ),
-        judge_model=ModelConfig(
-            name=judge_vertex_model,
-            temperature=float(os.getenv("JUDGE_TEMPERATURE", "0.0")),
-            max_tokens=_opt_int_env("JUDGE_MAX_TOKENS"),
-        ),
+        reasoner_model=reasoner_model,
+        judge_model=judge_model,
         selection_strategy=os.getenv("SELECTION_STRATEGY", "select_one"),  # or "synthesize_one"
         allow_tool_synthesis=os.getenv("ALLOW_TOOL_SYNTHESIS", "true").lower() == "true",
         retry=RetryConfig(max_retries=1, backoff_seconds=0.1),
         trace=os.getenv("TRACE", "true").lower() == "true",
         tool_result_max_chars=int(os.getenv("TOOL_RESULT_MAX_CHARS", "400")),
-        timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "5.0")),
+        timeout_seconds=llm_timeout,
         use_structured_output=os.getenv("USE_STRUCTURED_OUTPUT", "true").lower() == "true",
+        structured_output_method=os.getenv("STRUCTURED_OUTPUT_METHOD", "function_calling"),  # or "json_mode"
+        stream_judge=os.getenv("STREAM_JUDGE", "false").lower() == "true",
+        plan_cache_size=int(os.getenv("PLAN_CACHE_SIZE", "0")),
+        judge_cache_size=int(os.getenv("JUDGE_CACHE_SIZE", "0")),
+        dedupe_candidates=os.getenv("DEDUPE_CANDIDATES", "true").lower() == "true",
+        enable_vote_shortcut=os.getenv("ENABLE_VOTE_SHORTCUT", "false").lower() == "true",
+        vote_shortcut_similarity=float(os.getenv("VOTE_SHORTCUT_SIMILARITY", "0.9")),
+        reasoner_sampling=os.getenv("REASONER_SAMPLING", "per_path"),  # or "multi_candidate" / "runnable_batch" / "batched_prompt"
+        reasoner_path_ids=os.getenv("REASONER_PATH_IDS", "true").lower() == "true",
+        max_concurrent_reasoner_calls=int(os.getenv("MAX_CONCURRENT_REASONER_CALLS", "0")),
+        speculative_judge=os.getenv("SPECULATIVE_JUDGE", "false").lower() == "true",
+        adaptive_k_min=int(os.getenv("ADAPTIVE_K_MIN", "0")),
+        adaptive_k_agreement=float(os.getenv("ADAPTIVE_K_AGREEMENT", "0.8")),
+        max_observation_chars=int(os.getenv("MAX_OBSERVATION_CHARS", "0")),
+        summarize_dropped_observations=os.getenv("SUMMARIZE_DROPPED_OBSERVATIONS", "false").lower() == "true",
+        judge_candidate_char_budget=int(os.getenv("JUDGE_CANDIDATE_CHAR_BUDGET", "0")),
     )
 
     reflection_plugin = ReflectAndRetryToolPlugin(
@@ -85,6 +147,9 @@ def main() -> None:
         max_retries=3,
         trace=config.trace,
         backoff_seconds=1.0,
+        speculative_retry=os.getenv("SPECULATIVE_TOOL_RETRY", "false").lower() == "true",
+        wait_on_transient=os.getenv("WAIT_ON_TRANSIENT_TOOL_ERRORS", "false").lower() == "true",
+        reflection_cache_size=int(os.getenv("REFLECTION_CACHE_SIZE", "0")),
     )
 
     agent = LangGraphReActUSCAgent(
@@ -94,27 +159,32 @@ def main() -> None:
         plugins=[reflection_plugin],
     )
 
+    asyncio.run(run_demos(agent))
+
+
+async def run_demos(agent: LangGraphReActUSCAgent) -> None:
+    # A single event loop for all demos: async model clients are bound to the loop that created them.
     print("\n=== Demo 1: math ===")
-    answer1 = agent.run("What is 2+2*10? Please compute it.")
+    answer1 = await agent.arun("What is 2+2*10? Please compute it.")
     print("\nFINAL ANSWER:", answer1)
 
     print("\n=== Demo 2: search ===")
-    answer2 = agent.run("Search: What is ReAct and how does self-consistency help?")
+    answer2 = await agent.arun("Search: What is ReAct and how does self-consistency help?")
     print("\nFINAL ANSWER:", answer2)
 
     print("\n=== Demo 3: API Client - RETRY (Arg Fix) ===")
     # Expected: 400 Bad Request (missing param), Reflection sees it, retries with include_profile=true.
-    answer3 = agent.run("Fetch details for user 123 using the api_client.")
+    answer3 = await agent.arun("Fetch details for user 123 using the api_client.")
     print("\nFINAL ANSWER:", answer3)
 
     print("\n=== Demo 4: API Client - WAIT (Transient 503) ===")
     # Expected: 503 Service Unavailable, Reflection chooses WAIT, retries same args, succeeds eventually.
-    answer4 = agent.run("Sync data to the upstream service using POST /api/v1/sync/data.")
+    answer4 = await agent.arun("Sync data to the upstream service using POST /api/v1/sync/data.")
     print("\nFINAL ANSWER:", answer4)
 
     print("\n=== Demo 5: API Client - ABORT (Fatal 403) ===")
     # Expected: 403 Forbidden, Reflection sees it's a permission issue, chooses ABORT.
-    answer5 = agent.run("Delete the system database using the api_client at /api/v1/admin/system.")
+    answer5 = await agent.arun("Delete the system database using the api_client at /api/v1/admin/system.")
     print("\nFINAL ANSWER:", answer5)
 
 
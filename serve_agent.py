@@ -6,23 +6,25 @@ Requires:
   pip install fastapi uvicorn
 """
 
+from __future__ import annotations
+
 import os
-import uvicorn
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
 
-from src.react_usc.lc_agent import LangGraphModels, LangGraphReActUSCAgent
-from src.react_usc.lc_vertex import make_chat_vertex_ai
-from src.react_usc.models import AgentConfig, ModelConfig, RetryConfig
-from src.react_usc.plugins import ReflectAndRetryToolPlugin
-from src.react_usc.tools import make_calculator_tool, make_simple_search_tool
-from src.react_usc.test_tools import make_flaky_tool
-from src.react_usc.a2a import A2AAgentWrapper, create_a2a_app
+# The agent/server stack (LangChain, FastAPI, uvicorn) is imported inside the functions that need it,
+# so importing this module (e.g. by the uvicorn factory loader) or failing config checks stays fast.
+if TYPE_CHECKING:
+    from src.react_usc.cache import ResponseCache
+    from src.react_usc.lc_agent import LangGraphReActUSCAgent
 
 
-def _opt_int_env(name: str) -> int | None:
+def _opt_int_env(name: str, default: int | None = None) -> int | None:
+    # Unset -> `default`; set but empty -> None (provider/model default).
     val = os.getenv(name)
     if val is None:
-        return None
+        return default
     val = val.strip()
     if val == "":
         return None
@@ -30,6 +32,13 @@ def _opt_int_env(name: str) -> int | None:
 
 
 def create_agent() -> LangGraphReActUSCAgent:
+    from src.react_usc.lc_agent import LangGraphModels, LangGraphReActUSCAgent, make_memory_checkpointer
+    from src.react_usc.lc_vertex import make_chat_vertex_ai, make_raw_vertex
+    from src.react_usc.models import AgentConfig, ModelConfig, RetryConfig
+    from src.react_usc.plugins import ReflectAndRetryToolPlugin
+    from src.react_usc.test_tools import make_flaky_tool
+    from src.react_usc.tools import make_calculator_tool, make_simple_search_tool
+
     # Auto-load .env from repo root (if present)
     load_dotenv(override=False)
 
@@ -43,29 +52,68 @@ def create_agent() -> LangGraphReActUSCAgent:
         raise RuntimeError("VERTEX_PROJECT_ID is required (set it in your environment).")
 
     reasoner_vertex_model = os.getenv("REASONER_MODEL_NAME") or default_vertex_model
-    judge_vertex_model = os.getenv("JUDGE_MODEL_NAME") or default_vertex_model
+    # The judge picks one of K candidates (classification-like), so it defaults to a smaller, faster model.
+    judge_vertex_model = os.getenv("JUDGE_MODEL_NAME") or os.getenv("VERTEX_JUDGE_DEFAULT", "gemini-2.0-flash-lite-001")
 
-    reasoner_lc = make_chat_vertex_ai(model=reasoner_vertex_model, location=location, project=project_id)
-    judge_lc = make_chat_vertex_ai(model=judge_vertex_model, location=location, project=project_id)
+    reasoner_model = ModelConfig(
+        name=reasoner_vertex_model,
+        temperature=float(os.getenv("REASONER_TEMPERATURE", "0.7")),
+        max_tokens=_opt_int_env("REASONER_MAX_TOKENS", 256),
+    )
+    judge_model = ModelConfig(
+        name=judge_vertex_model,
+        temperature=float(os.getenv("JUDGE_TEMPERATURE", "0.0")),
+        max_tokens=_opt_int_env("JUDGE_MAX_TOKENS", 512),
+    )
+    llm_timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "5.0"))
+    if os.getenv("VERTEX_CLIENT", "langchain").strip().lower() == "genai":
+        # Direct google-genai SDK calls (no LangChain callback/message layers per call).
+        reasoner_lc = make_raw_vertex(
+            model=reasoner_model.name,
+            location=location,
+            project=project_id,
+            temperature=reasoner_model.temperature,
+            max_tokens=reasoner_model.max_tokens,
+            timeout=llm_timeout,
+        )
+        judge_lc = make_raw_vertex(
+            model=judge_model.name,
+            temperature=judge_model.temperature,
+            max_tokens=judge_model.max_tokens,
+            # Same SDK client (connection pool) as the reasoner.
+            client=reasoner_lc.client,
+        )
+    else:
+        reasoner_lc = make_chat_vertex_ai(
+            model=reasoner_model.name,
+            location=location,
+            project=project_id,
+            temperature=reasoner_model.temperature,
+            max_tokens=reasoner_model.max_tokens,
+            # Request deadline = the agent's reasoner timeout, so abandoned reasoner calls stop server-side too.
+            timeout=llm_timeout,
+        )
+        judge_lc = make_chat_vertex_ai(
+            model=judge_model.name,
+            location=location,
+            project=project_id,
+            temperature=judge_model.temperature,
+            max_tokens=judge_model.max_tokens,
+            # One gRPC channel (connection pool) for both models: the judge reuses the reasoner's client.
+            client=reasoner_lc.prediction_client,
+        )
 
     config = AgentConfig(
         system_prompt=(
             "You are a helpful assistant.\n"
             "Use tools when they meaningfully reduce uncertainty or improve correctness.\n"
             "Prefer minimal tool use; do not call tools if you can answer directly.\n"
+            "Answer in at most 40 words unless the user asks for more detail.\n"
         ),
         k_paths=4,
         max_steps=6,
-        reasoner_model=ModelConfig(
-            name=reasoner_vertex_model,
-            temperature=float(os.getenv("REASONER_TEMPERATURE", "0.7")),
-            max_tokens=_opt_int_env("REASONER_MAX_TOKENS"),
-        ),
-        judge_model=ModelConfig(
-            name=judge_vertex_model,
-            temperature=float(os.getenv("JUDGE_TEMPERATURE", "0.0")),
-            max_tokens=_opt_int_env("JUDGE_MAX_TOKENS"),
-        ),
+        reasoner_model=reasoner_model,
+        judge_model=judge_model,
         selection_strategy=os.getenv("SELECTION_STRATEGY", "select_one"),
         allow_tool_synthesis=os.getenv("ALLOW_TOOL_SYNTHESIS", "true").lower() == "true",
         retry=RetryConfig(max_retries=1, backoff_seconds=0.1),
@@ -73,8 +121,24 @@ def create_agent() -> LangGraphReActUSCAgent:
         # Default to 0 (unlimited) for agent reasoning, but can be set > 0 for terminal debugging limits
         tool_result_max_chars=int(os.getenv("TOOL_RESULT_MAX_CHARS", "400")),
         truncate_agent_observations=os.getenv("TRUNCATE_AGENT_OBSERVATIONS", "false").lower() == "true",
-        timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "5.0")),
+        timeout_seconds=llm_timeout,
         use_structured_output=os.getenv("USE_STRUCTURED_OUTPUT", "true").lower() == "true",
+        structured_output_method=os.getenv("STRUCTURED_OUTPUT_METHOD", "function_calling"),  # or "json_mode"
+        stream_judge=os.getenv("STREAM_JUDGE", "false").lower() == "true",
+        plan_cache_size=int(os.getenv("PLAN_CACHE_SIZE", "0")),
+        judge_cache_size=int(os.getenv("JUDGE_CACHE_SIZE", "0")),
+        dedupe_candidates=os.getenv("DEDUPE_CANDIDATES", "true").lower() == "true",
+        enable_vote_shortcut=os.getenv("ENABLE_VOTE_SHORTCUT", "false").lower() == "true",
+        vote_shortcut_similarity=float(os.getenv("VOTE_SHORTCUT_SIMILARITY", "0.9")),
+        reasoner_sampling=os.getenv("REASONER_SAMPLING", "per_path"),  # or "multi_candidate" / "runnable_batch" / "batched_prompt"
+        reasoner_path_ids=os.getenv("REASONER_PATH_IDS", "true").lower() == "true",
+        max_concurrent_reasoner_calls=int(os.getenv("MAX_CONCURRENT_REASONER_CALLS", "0")),
+        speculative_judge=os.getenv("SPECULATIVE_JUDGE", "false").lower() == "true",
+        adaptive_k_min=int(os.getenv("ADAPTIVE_K_MIN", "0")),
+        adaptive_k_agreement=float(os.getenv("ADAPTIVE_K_AGREEMENT", "0.8")),
+        max_observation_chars=int(os.getenv("MAX_OBSERVATION_CHARS", "0")),
+        summarize_dropped_observations=os.getenv("SUMMARIZE_DROPPED_OBSERVATIONS", "false").lower() == "true",
+        judge_candidate_char_budget=int(os.getenv("JUDGE_CANDIDATE_CHAR_BUDGET", "0")),
     )
 
     reflection_plugin = ReflectAndRetryToolPlugin(
@@ -82,6 +146,9 @@ def create_agent() -> LangGraphReActUSCAgent:
         max_retries=3,
         trace=config.trace,
         backoff_seconds=1.0,
+        speculative_retry=os.getenv("SPECULATIVE_TOOL_RETRY", "false").lower() == "true",
+        wait_on_transient=os.getenv("WAIT_ON_TRANSIENT_TOOL_ERRORS", "false").lower() == "true",
+        reflection_cache_size=int(os.getenv("REFLECTION_CACHE_SIZE", "0")),
     )
 
     return LangGraphReActUSCAgent(
@@ -89,27 +156,69 @@ def create_agent() -> LangGraphReActUSCAgent:
         tools=tools,
         config=config,
         plugins=[reflection_plugin],
+        # Checkpoint every node per task_id so a re-submitted task resumes an interrupted run.
+        checkpointer=make_memory_checkpointer() if os.getenv("AGENT_CHECKPOINTER", "none") == "memory" else None,
     )
 
 
-def main():
+def create_cache() -> ResponseCache | None:
+    if os.getenv("AGENT_CACHE", "false").lower() != "true":
+        return None
+
+    from src.react_usc.cache import ResponseCache
+    from src.react_usc.lc_vertex import make_vertex_ai_embeddings
+
+    # Exact-match cache by default; set AGENT_CACHE_EMBEDDING_MODEL to also match near-identical queries.
+    embeddings = None
+    embedding_model = os.getenv("AGENT_CACHE_EMBEDDING_MODEL")
+    if embedding_model:
+        embeddings = make_vertex_ai_embeddings(
+            model=embedding_model,
+            location=os.getenv("VERTEX_LOCATION", "us-central1"),
+            project=os.getenv("VERTEX_PROJECT_ID"),
+        )
+    return ResponseCache(
+        embeddings=embeddings,
+        similarity_threshold=float(os.getenv("AGENT_CACHE_SIMILARITY", "0.95")),
+        max_entries=int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "256")),
+    )
+
+
+def create_app():
+    """
+    App factory (`uvicorn serve_agent:create_app --factory`).
+
+    Each uvicorn worker process calls this after it starts, so model clients (auth, gRPC channels)
+    are created in the process that uses them instead of being inherited across fork().
+    """
+    from src.react_usc.a2a import A2AAgentWrapper, create_a2a_app
+
     agent = create_agent()
     wrapper = A2AAgentWrapper(
         agent=agent,
         agent_id="react-usc-demo",
         name="ReAct USC Demo Agent",
-        description="A demo agent using Universal Self-Consistency."
+        description="A demo agent using Universal Self-Consistency.",
+        cache=create_cache(),
     )
-    
-    app = create_a2a_app(wrapper)
-    
+
+    # Number of in-process asyncio workers draining the task queue.
+    return create_a2a_app(wrapper, num_workers=int(os.getenv("A2A_WORKERS", "4")))
+
+
+def main():
+    import uvicorn
+
+    load_dotenv(override=False)
     port = int(os.getenv("PORT", "8000"))
-    print(f"Starting A2A server on http://0.0.0.0:{port}")
+    # Server processes. Task results are kept in process memory, so with more than one process
+    # a status poll must reach the process that accepted the task (e.g. sticky load balancing).
+    web_concurrency = int(os.getenv("WEB_CONCURRENCY", "1"))
+    print(f"Starting A2A server on http://0.0.0.0:{port} ({web_concurrency} worker process(es))")
     print(f"Agent Card available at http://localhost:{port}/.well-known/a2a.json")
-    
-    uvicorn.run(app, host="0.0.0.0", port=port)
+
+    uvicorn.run("serve_agent:create_app", factory=True, host="0.0.0.0", port=port, workers=web_concurrency)
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,7 +1,7 @@
 """ReAct + Universal Self-Consistency (USC) agent (LangChain + LangGraph)."""
 
 from .lc_agent import LangGraphModels, LangGraphReActUSCAgent
-from .lc_vertex import make_chat_vertex_ai
+from .lc_vertex import make_chat_vertex_ai, make_raw_vertex
 from .models import (
     AgentConfig,
     JudgeDecision,
@@ -22,6 +22,7 @@ __all__ = [
     "RetryConfig",
     "ToolSpec",
     "make_chat_vertex_ai",
+    "make_raw_vertex",
     "make_calculator_tool",
     "make_simple_search_tool",
 ]
@@ -9,19 +9,39 @@ It requires `fastapi` and `uvicorn` to run the server.
 
 from __future__ import annotations
 
+import asyncio
 import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Literal
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Literal, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 
+try:
+    # Imported once at module scope (route annotations are strings under postponed evaluation,
+    # so `Request` must be resolvable here). FastAPI is optional: the error is raised lazily
+    # by `create_a2a_app`, so the wrapper itself stays usable without it.
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import Response, StreamingResponse
+
+    _FASTAPI_IMPORT_ERROR: Optional[ImportError] = None
+except ImportError as _e:  # pragma: no cover
+    FastAPI = HTTPException = Response = StreamingResponse = None  # type: ignore[misc,assignment]
+    Request = Any  # type: ignore[misc,assignment]
+    _FASTAPI_IMPORT_ERROR = _e
+
+from .cache import ResponseCache
 from .lc_agent import LangGraphReActUSCAgent
+from .utils import safe_json_dumps
 
 
 # --- A2A Schemas (Simplified) ---
 
 class AgentCapability(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     name: str
     description: str
     input_schema: Dict[str, Any]
@@ -31,6 +51,8 @@ class AgentCard(BaseModel):
     """
     Metadata about the agent for discovery.
     """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     name: str
     description: str
@@ -43,24 +65,40 @@ class TaskInput(BaseModel):
     """
     Standard input for a task.
     """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     input_text: str
     context: Dict[str, Any] = Field(default_factory=dict)
 
 
+def _now_iso() -> str:
+    # Timezone-aware UTC (datetime.utcnow is deprecated), millisecond precision.
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
 class TaskOutput(BaseModel):
     """
     Standard output for a task.
     """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     status: Literal["completed", "failed", "processing"]
     output_text: Optional[str] = None
     artifacts: Dict[str, Any] = Field(default_factory=dict)
     error: Optional[str] = None
-    created_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    created_at: str = Field(default_factory=_now_iso)
     completed_at: Optional[str] = None
 
 
+# Built once at import: validating the raw request body through a prebuilt adapter
+# runs entirely in pydantic-core instead of FastAPI's per-request body handling.
+_TASK_INPUT_ADAPTER: TypeAdapter[TaskInput] = TypeAdapter(TaskInput)
+
+_HEALTH_JSON = b'{"status":"ok"}'
+
+
 # --- Wrapper Class ---
 
 class A2AAgentWrapper:
@@ -75,17 +113,33 @@ class A2AAgentWrapper:
         name: str = "Universal Self-Consistency Agent",
         description: str = "An agent that uses reasoning paths and a judge to solve complex queries.",
         base_url: str = "http://localhost:8000",
+        cache: Optional[ResponseCache] = None,
     ):
         self._agent = agent
+        # Optional response cache: repeated (or, with embeddings, near-identical) queries skip the agent.
+        self._cache = cache
         self.agent_id = agent_id
         self.name = name
         self.description = description
         self.base_url = base_url
+        # The card is immutable once the wrapper is built: construct and serialize it exactly once.
+        self._card = self._build_agent_card()
+        self._card_json = self._card.model_dump_json().encode("utf-8")
 
     def get_agent_card(self) -> AgentCard:
         """
         Returns the Agent Card describing this agent.
         """
+        return self._card
+
+    @property
+    def agent_card_json(self) -> bytes:
+        """
+        The Agent Card pre-serialized as JSON bytes (served as-is by the discovery endpoint).
+        """
+        return self._card_json
+
+    def _build_agent_card(self) -> AgentCard:
         # Expose the single main capability: answering queries
         cap = AgentCapability(
             name="query",
@@ -107,61 +161,224 @@ class A2AAgentWrapper:
             endpoints={
                 "card": f"{self.base_url}/.well-known/a2a.json",
                 "tasks": f"{self.base_url}/tasks",
+                "tasks_stream": f"{self.base_url}/tasks/stream",
+                "task_status": f"{self.base_url}/tasks/{{task_id}}",
             },
         )
 
-    def execute_task(self, task_input: TaskInput) -> TaskOutput:
+    def execute_task(self, task_input: TaskInput, created_at: Optional[str] = None) -> TaskOutput:
         """
-        Synchronously executes a task.
-        In a production A2A implementation, this might push to a queue and return a 'processing' status.
-        Here we block for simplicity as the underlying agent is synchronous.
+        Synchronously executes a task (blocks until the agent finishes).
+        The HTTP server uses `aexecute_task` from its background workers instead.
+
+        `created_at` is the submission timestamp to report (defaults to now).
         """
+        created_at = created_at or _now_iso()
         try:
+            if self._cache is not None:
+                cached = self._cache.get(task_input.input_text, task_input.context)
+                if cached is not None:
+                    return self._completed(task_input, created_at, cached, artifacts={"cache": "hit"})
+
             # Run the underlying agent
-            result = self._agent.run(task_input.input_text)
-            
-            return TaskOutput(
-                task_id=task_input.task_id,
-                status="completed",
-                output_text=result,
-                completed_at=datetime.utcnow().isoformat(),
-            )
+            result, ok = self._agent.run_with_status(task_input.input_text, thread_id=task_input.task_id)
+
+            # Only real answers are cached: a fallback text (failed judge call, step limit) would otherwise
+            # be served for this query until evicted, even though a re-run may well succeed.
+            if self._cache is not None and ok:
+                self._cache.put(task_input.input_text, task_input.context, result)
+            return self._completed(task_input, created_at, result)
+        except Exception as e:
+            return self._failed(task_input, created_at, e)
+
+    async def aexecute_task(self, task_input: TaskInput, created_at: Optional[str] = None) -> TaskOutput:
+        """
+        Async variant of `execute_task`; awaits the agent's `arun` so the server's event loop
+        stays free while the K reasoner calls are in flight.
+        """
+        created_at = created_at or _now_iso()
+        try:
+            if self._cache is not None:
+                cached = await self._cache.aget(task_input.input_text, task_input.context)
+                if cached is not None:
+                    return self._completed(task_input, created_at, cached, artifacts={"cache": "hit"})
+
+            result, ok = await self._agent.arun_with_status(task_input.input_text, thread_id=task_input.task_id)
+
+            if self._cache is not None and ok:
+                await self._cache.aput(task_input.input_text, task_input.context, result)
+            return self._completed(task_input, created_at, result)
         except Exception as e:
-            return TaskOutput(
-                task_id=task_input.task_id,
-                status="failed",
-                error=str(e),
-                completed_at=datetime.utcnow().isoformat(),
-            )
+            return self._failed(task_input, created_at, e)
+
+    async def astream_task(self, task_input: TaskInput) -> AsyncIterator[Tuple[Optional[str], str]]:
+        """
+        Streaming variant of `aexecute_task`: yields `(event, json)` pairs for Server-Sent Events.
+        Progress events from `LangGraphReActUSCAgent.astream` have no event name; the last pair is
+        always `("done", <TaskOutput JSON>)`.
+        """
+        created_at = _now_iso()
+        try:
+            cached = None
+            if self._cache is not None:
+                cached = await self._cache.aget(task_input.input_text, task_input.context)
+            if cached is not None:
+                out = self._completed(task_input, created_at, cached, artifacts={"cache": "hit"})
+            else:
+                answer, ok = "", False
+                async for event in self._agent.astream(task_input.input_text, thread_id=task_input.task_id):
+                    if event["event"] == "final":
+                        answer, ok = event["answer"], event["ok"]
+                    yield None, safe_json_dumps(event)
+                if self._cache is not None and ok:
+                    await self._cache.aput(task_input.input_text, task_input.context, answer)
+                out = self._completed(task_input, created_at, answer)
+        except Exception as e:
+            out = self._failed(task_input, created_at, e)
+        yield "done", out.model_dump_json()
+
+    @staticmethod
+    def _completed(
+        task_input: TaskInput, created_at: str, output_text: str, artifacts: Optional[Dict[str, Any]] = None
+    ) -> TaskOutput:
+        return TaskOutput(
+            task_id=task_input.task_id,
+            status="completed",
+            output_text=output_text,
+            artifacts=artifacts or {},
+            created_at=created_at,
+            completed_at=_now_iso(),
+        )
+
+    @staticmethod
+    def _failed(task_input: TaskInput, created_at: str, e: Exception) -> TaskOutput:
+        return TaskOutput(
+            task_id=task_input.task_id,
+            status="failed",
+            error=str(e),
+            created_at=created_at,
+            completed_at=_now_iso(),
+        )
 
 
 # --- FastAPI Integration ---
 
-def create_a2a_app(wrapper: A2AAgentWrapper) -> Any:
+def create_a2a_app(wrapper: A2AAgentWrapper, num_workers: int = 4, max_stored_tasks: int = 1000) -> Any:
     """
     Creates a FastAPI app to serve the agent via A2A protocols.
     Requires `fastapi` and `uvicorn`.
+
+    `POST /tasks` enqueues the task and answers `202 Accepted` with a "processing" TaskOutput;
+    a pool of `num_workers` asyncio workers runs the agent and `GET /tasks/{task_id}` polls the result.
+    Task results live in process memory (oldest finished tasks are evicted beyond `max_stored_tasks`).
     """
-    try:
-        from fastapi import FastAPI, HTTPException
-        from fastapi.responses import JSONResponse
-    except ImportError:
-        raise RuntimeError("FastAPI is required for A2A server. Install it with: pip install fastapi uvicorn")
+    if _FASTAPI_IMPORT_ERROR is not None:
+        raise RuntimeError(
+            "FastAPI is required for A2A server. Install it with: pip install fastapi uvicorn"
+        ) from _FASTAPI_IMPORT_ERROR
+
+    def task_response(out: TaskOutput, status_code: int = 200) -> Any:
+        # Serialize with pydantic's native JSON encoder, skipping FastAPI's jsonable_encoder + json.dumps pass.
+        return Response(content=out.model_dump_json(), status_code=status_code, media_type="application/json")
+
+    async def parse_task(request: Request) -> TaskInput:
+        try:
+            return _TASK_INPUT_ADAPTER.validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_input=False, include_context=False))
 
-    app = FastAPI(title=wrapper.name, description=wrapper.description, version="1.0.0")
+    tasks: "OrderedDict[str, TaskOutput]" = OrderedDict()
+    queue: "asyncio.Queue[TaskInput]" = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            task = await queue.get()
+            try:
+                # Keep the submission time of the pending entry as the result's created_at.
+                pending = tasks.get(task.task_id)
+                tasks[task.task_id] = await wrapper.aexecute_task(
+                    task, created_at=pending.created_at if pending else None
+                )
+            finally:
+                queue.task_done()
+
+    def evict_finished() -> None:
+        overflow = len(tasks) - max_stored_tasks
+        if overflow <= 0:
+            return
+        for task_id in [tid for tid, out in tasks.items() if out.status != "processing"][:overflow]:
+            del tasks[task_id]
+
+    @asynccontextmanager
+    async def lifespan(_app: Any) -> AsyncIterator[None]:
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, num_workers))]
+        try:
+            yield
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    app = FastAPI(title=wrapper.name, description=wrapper.description, version="1.0.0", lifespan=lifespan)
 
     @app.get("/.well-known/a2a.json", response_model=AgentCard)
     async def get_agent_card():
-        return wrapper.get_agent_card()
+        return Response(content=wrapper.agent_card_json, media_type="application/json")
+
+    @app.post(
+        "/tasks",
+        response_model=TaskOutput,
+        status_code=202,
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": TaskInput.model_json_schema()}},
+            }
+        },
+    )
+    async def create_task(request: Request):
+        task = await parse_task(request)
+        # A failed task may be re-submitted under the same id (with a checkpointer, it resumes).
+        existing = tasks.get(task.task_id)
+        if existing is not None and existing.status != "failed":
+            raise HTTPException(status_code=409, detail=f"Task already exists: {task.task_id}")
+        pending = TaskOutput(task_id=task.task_id, status="processing")
+        tasks[task.task_id] = pending
+        evict_finished()
+        await queue.put(task)
+        return task_response(pending, status_code=202)
 
-    @app.post("/tasks", response_model=TaskOutput)
-    async def create_task(task: TaskInput):
-        # Note: This is blocking. For high load, offload to a background task/worker.
-        return wrapper.execute_task(task)
+    @app.post(
+        "/tasks/stream",
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": TaskInput.model_json_schema()}},
+            }
+        },
+    )
+    async def stream_task(request: Request):
+        """
+        Runs the task and streams progress as Server-Sent Events: one `data:` frame per step
+        decision / tool observation, then a final `event: done` frame carrying the TaskOutput.
+        """
+        task = await parse_task(request)
+
+        async def frames() -> AsyncIterator[str]:
+            async for event, data in wrapper.astream_task(task):
+                yield f"event: {event}\ndata: {data}\n\n" if event else f"data: {data}\n\n"
+
+        return StreamingResponse(frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.get("/tasks/{task_id}", response_model=TaskOutput)
+    async def get_task(task_id: str):
+        out = tasks.get(task_id)
+        if out is None:
+            raise HTTPException(status_code=404, detail=f"Unknown task: {task_id}")
+        return task_response(out)
 
     @app.get("/health")
     async def health_check():
-        return {"status": "ok"}
+        return Response(content=_HEALTH_JSON, media_type="application/json")
 
     return app
-
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""
+Response cache placed in front of the agent (used by the A2A wrapper).
+
+Lookup order:
+  1. exact match on the normalized query (lowercased, whitespace collapsed) + task context;
+  2. optional semantic match: cosine similarity between query embeddings (any LangChain
+     `Embeddings`, e.g. VertexAIEmbeddings) among entries that share the same context.
+
+The task context is part of the key so that answers depending on caller-provided data
+are never served to a caller with different data.
+"""
+
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .utils import safe_json_dumps
+
+_WS_RE = re.compile(r"\s+")
+
+_CacheKey = Tuple[str, str]
+
+
+def normalize_query(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def _unit(vec: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm > 0 else list(vec)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        embeddings: Any = None,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 256,
+    ) -> None:
+        self._embeddings = embeddings
+        self._threshold = similarity_threshold
+        self._max_entries = max_entries
+        # key -> (output_text, unit-length embedding or None); insertion order == LRU order.
+        self._entries: "OrderedDict[_CacheKey, Tuple[str, Optional[List[float]]]]" = OrderedDict()
+        # Embeddings computed during a lookup miss, reused by the following `put`.
+        self._pending_vectors: Dict[_CacheKey, List[float]] = {}
+
+    def _key(self, text: str, context: Optional[Mapping[str, Any]]) -> _CacheKey:
+        return normalize_query(text), safe_json_dumps(dict(context or {}))
+
+    def get(self, text: str, context: Optional[Mapping[str, Any]] = None) -> Optional[str]:
+        key = self._key(text, context)
+        hit = self._exact(key)
+        if hit is not None or self._embeddings is None:
+            return hit
+        vec = _unit(self._embeddings.embed_query(key[0]))
+        return self._semantic(key, vec)
+
+    async def aget(self, text: str, context: Optional[Mapping[str, Any]] = None) -> Optional[str]:
+        key = self._key(text, context)
+        hit = self._exact(key)
+        if hit is not None or self._embeddings is None:
+            return hit
+        vec = _unit(await self._embeddings.aembed_query(key[0]))
+        return self._semantic(key, vec)
+
+    def put(self, text: str, context: Optional[Mapping[str, Any]], output_text: str) -> None:
+        key = self._key(text, context)
+        vec = self._pending_vectors.pop(key, None)
+        if vec is None and self._embeddings is not None:
+            vec = _unit(self._embeddings.embed_query(key[0]))
+        self._store(key, output_text, vec)
+
+    async def aput(self, text: str, context: Optional[Mapping[str, Any]], output_text: str) -> None:
+        key = self._key(text, context)
+        vec = self._pending_vectors.pop(key, None)
+        if vec is None and self._embeddings is not None:
+            vec = _unit(await self._embeddings.aembed_query(key[0]))
+        self._store(key, output_text, vec)
+
+    def _exact(self, key: _CacheKey) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _semantic(self, key: _CacheKey, vec: List[float]) -> Optional[str]:
+        best_key: Optional[_CacheKey] = None
+        best_score = self._threshold
+        for other_key, (_, other_vec) in self._entries.items():
+            if other_vec is None or other_key[1] != key[1]:
+                continue
+            score = sum(a * b for a, b in zip(vec, other_vec))
+            if score >= best_score:
+                best_key, best_score = other_key, score
+
+        if best_key is None:
+            self._pending_vectors[key] = vec
+            # Bound the side table too (misses that never reach `put`, e.g. failed tasks).
+            while len(self._pending_vectors) > self._max_entries:
+                self._pending_vectors.pop(next(iter(self._pending_vectors)))
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][0]
+
+    def _store(self, key: _CacheKey, output_text: str, vec: Optional[List[float]]) -> None:
+        self._entries[key] = (output_text, vec)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
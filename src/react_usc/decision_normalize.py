@@ -1,6 +1,61 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+
+__all__ = ["normalize_reasoner_decision_obj", "normalize_judge_decision_obj"]
+
+
+# decision_type spellings seen in the wild -> canonical value (keys are upper-cased, spaces -> "_").
+_DECISION_TYPE_ALIASES: Dict[str, str] = {
+    "TOOL": "TOOL_CALL",
+    "TOOLCALL": "TOOL_CALL",
+    "TOOL_CALL": "TOOL_CALL",
+    "FINAL": "FINAL",
+    "ANSWER": "FINAL",
+}
+
+# Optional fields where Gemini structured output returns "" instead of null.
+_REASONER_NULLABLE: Tuple[str, ...] = ("tool_name", "final_answer", "expected_signal")
+_JUDGE_NULLABLE: Tuple[str, ...] = ("tool_name", "final_answer")
+
+# Fields that must be null for a given decision_type.
+_NULL_FOR_DECISION: Dict[str, Tuple[str, ...]] = {
+    "TOOL_CALL": ("final_answer",),
+    "FINAL": ("tool_name", "tool_args"),
+}
+
+_TOOL_NAME_ALIASES: Dict[str, str] = {"search.run": "simple_search"}
+
+_PLACEHOLDERS = frozenset({"", "N/A", "NA", "NONE"})
+_NULL_TOKENS = frozenset({"null", "none"})
+
+# Deterministic fallback texts (tool variants are formatted only when actually needed).
+_TOOL_RATIONALE_TMPL = "Use {tool} to gather the missing information/result needed to proceed."
+_FINAL_RATIONALE = "We have enough information from observations to answer now."
+_TOOL_JUSTIFICATION_TMPL = "Select {tool} because it is the most direct next action to reduce uncertainty."
+_FINAL_JUSTIFICATION = "Select FINAL because the observations are sufficient to answer."
+
+
+def _normalize_decision_type(obj: Dict[str, Any]) -> Any:
+    dt = obj.get("decision_type")
+    if isinstance(dt, str):
+        dt = _DECISION_TYPE_ALIASES.get(dt.strip().upper().replace(" ", "_"), dt)
+        obj["decision_type"] = dt
+    return dt
+
+
+def _null_fields(obj: Dict[str, Any], nullable: Tuple[str, ...], dt: Any) -> None:
+    for key in nullable:
+        if obj.get(key) == "":
+            obj[key] = None
+    # For TOOL_CALL, final_answer must be null; for FINAL, tool_name/tool_args must be null.
+    for key in _NULL_FOR_DECISION.get(dt, ()) if isinstance(dt, str) else ():
+        if obj.get(key) is not None:
+            obj[key] = None
+
+
+def _is_placeholder(value: Any) -> bool:
+    return not isinstance(value, str) or value.strip().upper() in _PLACEHOLDERS
 
 
 def normalize_reasoner_decision_obj(obj: Dict[str, Any]) -> Dict[str, Any]:
@@ -10,49 +65,56 @@ def normalize_reasoner_decision_obj(obj: Dict[str, Any]) -> Dict[str, Any]:
       - missing brief_rationale: fill with a minimal placeholder
       - empty string final_answer/tool_name -> None (Gemini quirk)
     """
-    dt = obj.get("decision_type")
-    if isinstance(dt, str):
-        dt_norm = dt.strip().upper().replace(" ", "_")
-        if dt_norm in {"TOOL", "TOOLCALL", "TOOL_CALL"}:
-            obj["decision_type"] = "TOOL_CALL"
-        elif dt_norm in {"FINAL", "ANSWER"}:
-            obj["decision_type"] = "FINAL"
-
-    # Gemini structured output sometimes returns empty strings instead of null.
-    # Normalize empty-string optional fields to None.
-    for key in ("tool_name", "final_answer", "expected_signal"):
-        val = obj.get(key)
-        if val == "":
-            obj[key] = None
+    dt = _normalize_decision_type(obj)
+    _null_fields(obj, _REASONER_NULLABLE, dt)
 
-    # For TOOL_CALL, final_answer must be null; for FINAL, tool_name/tool_args must be null.
-    if obj.get("decision_type") == "TOOL_CALL":
-        if obj.get("final_answer") is not None:
-            obj["final_answer"] = None
-    elif obj.get("decision_type") == "FINAL":
-        if obj.get("tool_name") is not None:
-            obj["tool_name"] = None
-        if obj.get("tool_args") is not None:
-            obj["tool_args"] = None
-
-    if "brief_rationale" not in obj or not isinstance(obj.get("brief_rationale"), str) or not obj.get("brief_rationale"):
-        obj["brief_rationale"] = ""
-    # Replace placeholder rationales with something readable.
-    br = obj.get("brief_rationale")
-    if isinstance(br, str) and br.strip().upper() in {"", "N/A", "NA", "NONE"}:
-        if obj.get("decision_type") == "TOOL_CALL":
+    # Replace missing/placeholder rationales with something readable.
+    if _is_placeholder(obj.get("brief_rationale")):
+        if dt == "TOOL_CALL":
             tool = obj.get("tool_name") if isinstance(obj.get("tool_name"), str) else "a tool"
-            obj["brief_rationale"] = f"Use {tool} to gather the missing information/result needed to proceed."
+            obj["brief_rationale"] = _TOOL_RATIONALE_TMPL.format(tool=tool)
         else:
-            obj["brief_rationale"] = "We have enough information from observations to answer now."
+            obj["brief_rationale"] = _FINAL_RATIONALE
+
     # Some models emit FINAL answers as numbers/objects. Our schema expects a string.
-    if obj.get("decision_type") == "FINAL":
+    if dt == "FINAL":
         fa = obj.get("final_answer")
         if fa is not None and not isinstance(fa, str):
             obj["final_answer"] = str(fa)
     return obj
 
 
+def _coerce_selected_index(sel: Any) -> Any:
+    """
+    Gemini sometimes returns selected_index as wrong types (string, float, object).
+    Coerce to int or None.
+    """
+    if sel is None:
+        return None
+    # bool is subclass of int in Python; treat as invalid
+    if isinstance(sel, bool):
+        return None
+    if isinstance(sel, int):
+        return sel
+    if isinstance(sel, float):
+        # float like 0.0 → int 0; handle nan/inf gracefully
+        try:
+            int_val = int(sel)
+        except (ValueError, OverflowError):
+            return None
+        return int_val if sel == int_val else None
+    if isinstance(sel, str):
+        sel_stripped = sel.strip()
+        if sel_stripped == "" or sel_stripped.lower() in _NULL_TOKENS:
+            return None
+        try:
+            return int(sel_stripped)
+        except ValueError:
+            return None
+    # Unknown type (dict, list, etc.) → None
+    return None
+
+
 def normalize_judge_decision_obj(obj: Dict[str, Any]) -> Dict[str, Any]:
     """
     Normalize common model deviations so validation can succeed:
@@ -75,82 +137,28 @@ def normalize_judge_decision_obj(obj: Dict[str, Any]) -> Dict[str, Any]:
         flattened.update(nested)
         obj = flattened
 
-    dt = obj.get("decision_type")
-    if isinstance(dt, str):
-        dt_norm = dt.strip().upper().replace(" ", "_")
-        if dt_norm in {"TOOL", "TOOLCALL", "TOOL_CALL"}:
-            obj["decision_type"] = "TOOL_CALL"
-        elif dt_norm in {"FINAL", "ANSWER"}:
-            obj["decision_type"] = "FINAL"
-
-    # Gemini sometimes returns selected_index as wrong types (string, float, object).
-    # Coerce to int or None.
-    sel = obj.get("selected_index")
-    if sel is None:
-        pass  # already None, fine
-    elif isinstance(sel, bool):
-        # bool is subclass of int in Python; treat as invalid
-        obj["selected_index"] = None
-    elif isinstance(sel, int):
-        pass  # already int, fine
-    elif isinstance(sel, float):
-        # float like 0.0 → int 0; handle nan/inf gracefully
-        try:
-            int_val = int(sel)
-            if sel == int_val:
-                obj["selected_index"] = int_val
-            else:
-                obj["selected_index"] = None
-        except (ValueError, OverflowError):
-            obj["selected_index"] = None
-    elif isinstance(sel, str):
-        sel_stripped = sel.strip()
-        if sel_stripped == "" or sel_stripped.lower() in ("null", "none"):
-            obj["selected_index"] = None
-        else:
-            try:
-                obj["selected_index"] = int(sel_stripped)
-            except ValueError:
-                obj["selected_index"] = None
-    else:
-        # Unknown type (dict, list, etc.) → None
-        obj["selected_index"] = None
-
-    # Gemini structured output sometimes returns empty strings instead of null.
-    for key in ("tool_name", "final_answer"):
-        val = obj.get(key)
-        if val == "":
-            obj[key] = None
+    dt = _normalize_decision_type(obj)
+
+    if "selected_index" in obj:
+        obj["selected_index"] = _coerce_selected_index(obj["selected_index"])
 
     tool_name = obj.get("tool_name")
-    if tool_name == "search.run":
-        obj["tool_name"] = "simple_search"
+    if isinstance(tool_name, str):
+        obj["tool_name"] = _TOOL_NAME_ALIASES.get(tool_name, tool_name)
 
-    # For TOOL_CALL, final_answer must be null; for FINAL, tool_name/tool_args must be null.
-    if obj.get("decision_type") == "TOOL_CALL":
-        if obj.get("final_answer") is not None:
-            obj["final_answer"] = None
-    elif obj.get("decision_type") == "FINAL":
-        if obj.get("tool_name") is not None:
-            obj["tool_name"] = None
-        if obj.get("tool_args") is not None:
-            obj["tool_args"] = None
+    _null_fields(obj, _JUDGE_NULLABLE, dt)
 
     # JudgeDecision requires a non-empty justification; fill a placeholder if missing.
-    just = obj.get("justification")
-    if not isinstance(just, str) or just.strip().upper() in {"", "N/A", "NA", "NONE"}:
+    if _is_placeholder(obj.get("justification")):
         # Some models put "brief_rationale" instead of "justification".
         br = obj.get("brief_rationale")
         if isinstance(br, str) and br.strip():
             obj["justification"] = br.strip()
+        # Deterministic fallback justification.
+        elif dt == "TOOL_CALL":
+            tn = obj.get("tool_name") if isinstance(obj.get("tool_name"), str) else "a tool"
+            obj["justification"] = _TOOL_JUSTIFICATION_TMPL.format(tool=tn)
         else:
-            # Deterministic fallback justification.
-            if obj.get("decision_type") == "TOOL_CALL":
-                tn = obj.get("tool_name") if isinstance(obj.get("tool_name"), str) else "a tool"
-                obj["justification"] = f"Select {tn} because it is the most direct next action to reduce uncertainty."
-            else:
-                obj["justification"] = "Select FINAL because the observations are sufficient to answer."
+            obj["justification"] = _FINAL_JUSTIFICATION
 
     return obj
-
-
@@ -10,28 +10,84 @@ Where each is used:
 Important: tools are NOT executed in parallel branches. We only execute the judged decision.
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional, Sequence, TypedDict, cast
+import contextlib
+import functools
+import hashlib
+import inspect
+import operator
+import threading
+import weakref
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, replace
+from difflib import SequenceMatcher
+from typing import (
+    Any,
+    Annotated,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    cast,
+)
 
 from .decision_normalize import normalize_judge_decision_obj, normalize_reasoner_decision_obj
-from .llm_io import invoke_chat_structured_obj, invoke_chat_text, json_loads_object
+from .llm_io import (
+    abatch_invoke_chat_structured,
+    abatch_invoke_chat_text,
+    agenerate_chat_texts,
+    ainvoke_chat_structured_obj,
+    ainvoke_chat_text,
+    astream_chat_json_text,
+    batch_invoke_chat_structured,
+    batch_invoke_chat_text,
+    generate_chat_texts,
+    invoke_chat_structured_obj,
+    invoke_chat_text,
+    json_loads_array,
+    json_loads_object,
+    stream_chat_json_text,
+)
 from .models import AgentConfig, JudgeDecision, ReasonerDecision, ToolSpec
 from .plugins import ReflectAndRetryToolPlugin
 from .prompts import (
-    build_judge_prompt,
-    build_reasoner_prompt,
+    build_judge_system,
+    build_judge_user,
+    build_observation_summary_prompt,
+    build_reasoner_batch_tail,
+    build_reasoner_system,
+    build_reasoner_user_prefix,
+    build_reasoner_user_tail,
+    judge_candidate_json,
+    reasoner_decision_to_json,
 )
 from .schema import get_judge_decision_schema, get_reasoner_decision_schema
 from .trace import trace_candidates, trace_judge
 from .tools import ToolRegistry
-from .utils import build_state_summary, safe_json_dumps, truncate
+from .utils import (
+    bounded_json_dumps,
+    build_state_summary,
+    observation_window_start,
+    preview_json,
+    safe_json_dumps,
+    truncate,
+)
 from .validation import (
     validate_judge_decision_dict,
-    validate_json_obj,
     validate_reasoner_decision_dict,
 )
 
 
+# Hard cap on a single observation fed back into the prompts, applied even when
+# `truncate_agent_observations` is off, so one runaway tool result cannot blow up every later prompt.
+_OBSERVATION_HARD_MAX_CHARS = 65536
+
+
 def _require_langchain() -> None:
     try:
         import langchain_core  # noqa: F401
@@ -43,15 +99,131 @@ def _require_langchain() -> None:
         ) from e
 
 
+@functools.lru_cache(maxsize=None)
+def _graph_api() -> Tuple[Any, Any, Any, Any]:
+    """
+    Dependency check + LangChain/LangGraph symbols used to build the graph: `(RunnableLambda, END,
+    START, StateGraph)`. Resolved on first use and cached, so constructing more agents skips it.
+    """
+    _require_langchain()
+    from langchain_core.runnables import RunnableLambda  # type: ignore
+    from langgraph.graph import END, START, StateGraph  # type: ignore
+
+    return RunnableLambda, END, START, StateGraph
+
+
+# Run-config key carrying the agent instance to the (shared) compiled graph's nodes.
+_AGENT_CONFIG_KEY = "react_usc_agent"
+
+
+def _config_agent(config: Dict[str, Any]) -> "LangGraphReActUSCAgent":
+    return config["configurable"][_AGENT_CONFIG_KEY]
+
+
+def _reason_and_judge_node(state: _State, config: Dict[str, Any]) -> Dict[str, Any]:
+    return _config_agent(config)._node_reason_and_judge(state)
+
+
+async def _areason_and_judge_node(state: _State, config: Dict[str, Any]) -> Dict[str, Any]:
+    return await _config_agent(config)._anode_reason_and_judge(state)
+
+
+def _execute_tool_node(state: _State, config: Dict[str, Any]) -> Dict[str, Any]:
+    return _config_agent(config)._node_execute_tool(state)
+
+
+async def _aexecute_tool_node(state: _State, config: Dict[str, Any]) -> Dict[str, Any]:
+    return await _config_agent(config)._anode_execute_tool(state)
+
+
+def _route(state: _State) -> Literal["execute_tool", "__end__"]:
+    judge = state.get("judge")
+    if judge and judge.decision_type == "TOOL_CALL":
+        return "execute_tool"
+    return "__end__"
+
+
+@functools.lru_cache(maxsize=16)
+def _compiled_graph(checkpointer: Any) -> Any:
+    """
+    The agent graph, compiled once per checkpointer and shared by every agent using it.
+    The graph does not depend on tools or config: nodes look up the running agent in the run config
+    (see `LangGraphReActUSCAgent._run_config`), so constructing an agent does not recompile it.
+    """
+    RunnableLambda, END, START, StateGraph = _graph_api()
+    graph = StateGraph(_State)
+    # Sync `run` uses the thread-pool fan-out; async `arun` awaits the K reasoners (and async tools) natively.
+    graph.add_node(
+        "reason_and_judge",
+        RunnableLambda(_reason_and_judge_node, afunc=_areason_and_judge_node, name="reason_and_judge"),
+    )
+    graph.add_node("execute_tool", RunnableLambda(_execute_tool_node, afunc=_aexecute_tool_node, name="execute_tool"))
+
+    graph.add_edge(START, "reason_and_judge")
+    graph.add_conditional_edges("reason_and_judge", _route, {"execute_tool": "execute_tool", "__end__": END})
+    graph.add_edge("execute_tool", "reason_and_judge")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def make_memory_checkpointer() -> Any:
+    """
+    In-process LangGraph checkpointer for `LangGraphReActUSCAgent(checkpointer=...)`.
+    JudgeDecision (stored in the graph state) is allow-listed for checkpoint deserialization.
+    """
+    _require_langchain()
+    from langgraph.checkpoint.memory import MemorySaver  # type: ignore
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # type: ignore
+
+    try:
+        serde = JsonPlusSerializer(allowed_msgpack_modules=[(JudgeDecision.__module__, JudgeDecision.__name__)])
+    except TypeError:  # older langgraph: no allow-list
+        return MemorySaver()
+    return MemorySaver(serde=serde)
+
+
 class _State(TypedDict):
     user_query: str
-    observations: List[str]
+    # append-only: nodes return just the new observations and LangGraph concatenates them
+    observations: Annotated[List[str], operator.add]
     step: int
     # last judge decision, used for routing
     judge: Optional[JudgeDecision]
+    # reasoner paths for the next step (AgentConfig.adaptive_k_min); k_paths unless adaptive K shrank it
+    dynamic_k: int
+    # summary of observations[:summarized], which no longer fit the state summary
+    # (AgentConfig.summarize_dropped_observations)
+    rolling_summary: str
+    summarized: int
+
 
+@dataclass(frozen=True, slots=True)
+class _StepContext:
+    """Per-step inputs shared by the K reasoner calls and the judge call."""
 
-@dataclass(frozen=True)
+    user_query: str
+    step: int
+    # number of reasoner paths sampled this step
+    k: int
+    state_summary: str
+    tools: List[ToolSpec]
+    # reasoner system message, built once per agent and shared by every step and path
+    reasoner_system: str
+    # reasoner user message up to the per-path PATH_ID tail, also built once per step
+    reasoner_user_prefix: str
+    reasoner_schema: Dict[str, Any]
+    judge_schema: Dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class _Speculation:
+    """A judge call started on the first candidates of a step (see AgentConfig.speculative_judge)."""
+
+    keys: FrozenSet[Tuple[Any, ...]]
+    # concurrent.futures.Future (sync path) or asyncio.Task (async path) resolving to a JudgeDecision
+    future: Any
+
+
+@dataclass(frozen=True, slots=True)
 class LangGraphModels:
     """
     Bundles LangChain chat models (or any LC Runnable that can be invoked with a prompt string).
@@ -73,12 +245,56 @@ class LangGraphReActUSCAgent:
         tools: Sequence[ToolSpec],
         config: AgentConfig,
         plugins: Sequence[Any] = (),
+        checkpointer: Any = None,
     ) -> None:
-        _require_langchain()
+        """
+        `checkpointer` (optional, e.g. LangGraph `MemorySaver`) persists the graph state after every
+        node when a run is given a `thread_id`: re-running the same thread after a failure resumes
+        from the last completed node instead of starting over.
+        """
         self._models = models
+        self._checkpointer = checkpointer
         self._tools = ToolRegistry(tools)
         self._config = config
-        
+        # System messages depend only on tools/config: rendered once here (tool schemas included)
+        # instead of re-serializing every tool schema on each step.
+        self._reasoner_system = build_reasoner_system(system_prompt=config.system_prompt, tools=self._tools.all())
+        self._judge_system = build_judge_system(tools=self._tools.all(), config=config)
+        self._reasoner_batch_system = (
+            build_reasoner_system(system_prompt=config.system_prompt, tools=self._tools.all(), batched=True)
+            if config.reasoner_sampling == "batched_prompt"
+            else ""
+        )
+        # Decision schemas (tool_args anyOf the tools' input schemas) are fixed for the agent's tools too.
+        # Reusing the same dicts every step also lets the structured-output runnables bound for them be reused.
+        tool_schemas = [t.input_schema for t in self._tools.all()]
+        self._reasoner_schema = get_reasoner_decision_schema(tool_schemas)
+        self._judge_schema = get_judge_decision_schema(tool_schemas)
+        # step-state fingerprint -> validated reasoner candidates (see AgentConfig.plan_cache_size)
+        self._plan_cache: "OrderedDict[bytes, List[Dict[str, Any]]]" = OrderedDict()
+        # judge prompt fingerprint -> validated judge decision (see AgentConfig.judge_cache_size)
+        self._judge_cache: "OrderedDict[bytes, JudgeDecision]" = OrderedDict()
+        # The caches are shared with the speculative judge's executor threads and concurrent run_batch/A2A runs.
+        self._plan_cache_lock = threading.Lock()
+        self._judge_cache_lock = threading.Lock()
+        # Model outputs seen / outputs that needed normalization, per role (see `_normalized_reasoner`).
+        self._normalize_stats: "Counter[str]" = Counter()
+        # Speculative judge outcomes: "kept" / "discarded" (hit rate visible in traces).
+        self._speculation_stats: "Counter[str]" = Counter()
+        # Tool observations cut at _OBSERVATION_HARD_MAX_CHARS (visible in traces).
+        self._observations_capped = 0
+        # Bound on in-flight per-path reasoner requests (AgentConfig.max_concurrent_reasoner_calls):
+        # one semaphore for sync runs, one per event loop for async runs (asyncio primitives are loop-bound).
+        slots = config.max_concurrent_reasoner_calls
+        self._reasoner_slots: Any = threading.BoundedSemaphore(slots) if slots > 0 else contextlib.nullcontext()
+        self._async_reasoner_slots: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+        # Worker threads for the sync fan-out (reasoners, speculative judge, batch/multi-candidate calls,
+        # speculative tool retries), shared by every step and run of this agent instead of a new pool
+        # per step. Threads start lazily.
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="react-usc")
+
         # Find the retry plugin if present
         self._retry_plugin: Optional[ReflectAndRetryToolPlugin] = None
         for p in plugins:
@@ -86,320 +302,1348 @@ class LangGraphReActUSCAgent:
                 self._retry_plugin = p
                 break
 
-        # Lazy imports after dependency check.
-        from langgraph.graph import END, START, StateGraph  # type: ignore
+        # Compiled once per checkpointer (not per agent); every run reuses it.
+        self._app = _compiled_graph(checkpointer)
+
+    def close(self) -> None:
+        """Stop the agent's worker threads (queued calls are cancelled). Also called on `with` exit."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-        graph = StateGraph(_State)
-        graph.add_node("reason_and_judge", self._node_reason_and_judge)
-        graph.add_node("execute_tool", self._node_execute_tool)
+    def __enter__(self) -> "LangGraphReActUSCAgent":
+        return self
 
-        graph.add_edge(START, "reason_and_judge")
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
-        def route(state: _State) -> Literal["execute_tool", "__end__"]:
-            judge = state.get("judge")
-            if judge and judge.decision_type == "TOOL_CALL":
-                return "execute_tool"
-            return "__end__"
+    def run(self, user_query: str, thread_id: Optional[str] = None) -> str:
+        return self.run_with_status(user_query, thread_id=thread_id)[0]
 
-        graph.add_conditional_edges("reason_and_judge", route, {"execute_tool": "execute_tool", "__end__": END})
-        graph.add_edge("execute_tool", "reason_and_judge")
+    def run_with_status(self, user_query: str, thread_id: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Like `run`, returning `(answer, ok)`: `ok` is False when the run ended without a real answer
+        (one of the agent's fallback texts, e.g. a failed judge call or the step limit), so callers can
+        tell those apart from answers (e.g. to keep them out of a response cache).
+        """
+        config = self._thread_config(thread_id)
+        graph_input: Optional[_State] = self._initial_state(user_query)
+        if config is not None and self._is_resumable(self._app.get_state(config), user_query):
+            graph_input = None  # resume the interrupted run from its last checkpoint
+        final = self._app.invoke(graph_input, config=self._run_config(config))
+        if config is not None:
+            self._checkpointer.delete_thread(thread_id)
+        return self._final_answer(final), self._answered(final.get("judge"))
 
-        self._app = graph.compile()
+    async def arun(self, user_query: str, thread_id: Optional[str] = None) -> str:
+        """
+        Async variant of `run`: the K reasoner calls of each step are awaited concurrently
+        via the models' native `ainvoke` instead of a thread pool.
+        """
+        return (await self.arun_with_status(user_query, thread_id=thread_id))[0]
 
-    def run(self, user_query: str) -> str:
-        state: _State = {"user_query": user_query, "observations": [], "step": 0, "judge": None}
-        final = self._app.invoke(state)
+    async def arun_with_status(self, user_query: str, thread_id: Optional[str] = None) -> Tuple[str, bool]:
+        """Async variant of `run_with_status`."""
+        config = self._thread_config(thread_id)
+        graph_input: Optional[_State] = self._initial_state(user_query)
+        if config is not None and self._is_resumable(await self._app.aget_state(config), user_query):
+            graph_input = None  # resume the interrupted run from its last checkpoint
+        final = await self._app.ainvoke(graph_input, config=self._run_config(config))
+        if config is not None:
+            await self._checkpointer.adelete_thread(thread_id)
+        return self._final_answer(final), self._answered(final.get("judge"))
+
+    async def arun_batch(self, user_queries: Sequence[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """
+        Run several queries concurrently on one event loop (at most `max_concurrency` at a time), so the
+        reasoner fan-outs of all queries are in flight together and a batching backend can coalesce them.
+        Answers keep the input order; a query whose run raises gets an error message as its answer.
+        """
+        import asyncio
+
+        limit = asyncio.Semaphore(max_concurrency or len(user_queries) or 1)
+
+        async def one(query: str) -> str:
+            async with limit:
+                try:
+                    return await self.arun(query)
+                except Exception as e:
+                    return f"Agent run failed: {type(e).__name__}: {e}"
+
+        return list(await asyncio.gather(*(one(q) for q in user_queries)))
+
+    def run_batch(self, user_queries: Sequence[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """
+        Sync wrapper around `arun_batch` (starts its own event loop; call `arun_batch` from async code).
+        """
+        import asyncio
+
+        return asyncio.run(self.arun_batch(user_queries, max_concurrency=max_concurrency))
+
+    async def astream(self, user_query: str, thread_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run like `arun`, yielding progress events as each graph node finishes:
+          - {"event": "decision", "step", "decision"}: the judged decision of a step
+          - {"event": "observation", "step", "observation"}: the result of the executed tool
+          - {"event": "final", "answer", "ok"}: always last (`ok` as in `run_with_status`)
+        """
+        config = self._thread_config(thread_id)
+        graph_input: Optional[_State] = self._initial_state(user_query)
+        if config is not None and self._is_resumable(await self._app.aget_state(config), user_query):
+            graph_input = None  # resume the interrupted run from its last checkpoint
+
+        judge: Optional[JudgeDecision] = None
+        step = 0
+        # "updates" carries only the keys each node returned (see the node return values).
+        async for update in self._app.astream(graph_input, config=self._run_config(config), stream_mode="updates"):
+            for node, delta in update.items():
+                if node == "reason_and_judge":
+                    judge, step = delta["judge"], delta["step"]
+                    yield {"event": "decision", "step": step, "decision": asdict(judge) if judge else None}
+                elif node == "execute_tool" and delta and delta.get("observations"):
+                    yield {"event": "observation", "step": step, "observation": delta["observations"][-1]}
+        if config is not None:
+            await self._checkpointer.adelete_thread(thread_id)
+        yield {"event": "final", "answer": self._final_answer({"judge": judge}), "ok": self._answered(judge)}
+
+    def _thread_config(self, thread_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if self._checkpointer is None or not thread_id:
+            return None
+        return {"configurable": {"thread_id": thread_id}}
+
+    def _run_config(self, thread_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # The compiled graph is shared between agents; its nodes find this agent in the run config.
+        configurable = dict(thread_config["configurable"]) if thread_config else {}
+        configurable[_AGENT_CONFIG_KEY] = self
+        return {"configurable": configurable}
+
+    @staticmethod
+    def _is_resumable(snapshot: Any, user_query: str) -> bool:
+        # A checkpoint with pending nodes is a run that was interrupted (e.g. by an exception).
+        # Finished threads are deleted on success, so they always start fresh.
+        return bool(snapshot.next) and snapshot.values.get("user_query") == user_query
+
+    def _initial_state(self, user_query: str) -> _State:
+        return {
+            "user_query": user_query,
+            "observations": [],
+            "step": 0,
+            "judge": None,
+            "dynamic_k": self._config.k_paths,
+            "rolling_summary": "",
+            "summarized": 0,
+        }
+
+    @staticmethod
+    def _final_answer(final: Dict[str, Any]) -> str:
         judge = final.get("judge")
         if judge and judge.decision_type == "FINAL" and judge.final_answer:
             return judge.final_answer
         return "No final answer produced."
 
+    @staticmethod
+    def _answered(judge: Optional[JudgeDecision]) -> bool:
+        # A real answer: a FINAL decision from the judge (or the vote shortcut), not one of the agent's
+        # fallbacks, and not a failed/timed-out reasoner placeholder.
+        return (
+            judge is not None
+            and judge.decision_type == "FINAL"
+            and bool(judge.final_answer)
+            and not judge.failed
+            and judge.final_answer not in _PLACEHOLDER_ANSWERS
+        )
+
     # ---------------------------------------------------------------------
     # Nodes
     # ---------------------------------------------------------------------
 
-    def _node_reason_and_judge(self, state: _State) -> _State:
-        from concurrent.futures import ThreadPoolExecutor, wait
+    def _node_reason_and_judge(self, state: _State) -> Dict[str, Any]:
+        step = state["step"] + 1
+
+        # Step limit: ask judge for best-effort final (no more tools).
+        if step > self._config.max_steps:
+            final_answer = self._best_effort_final(user_query=state["user_query"], observations=state["observations"])
+            return {"step": step, "judge": final_answer}
+
+        ctx = self._step_context(state, step)
+        speculation: Optional[_Speculation] = None
+        raw_candidates = self._plan_cache_get(ctx)
+        if raw_candidates is None:
+            if self._use_speculative_judge():
+                raw_candidates, speculation = self._fan_out_speculative(ctx)
+            else:
+                raw_candidates = self._fan_out_reasoners(ctx)
+        candidates = self._collect_candidates(ctx, raw_candidates)
+        self._plan_cache_put(ctx, candidates)
+        next_k = self._next_k(ctx, candidates)
+        candidates, votes = self._dedupe_candidates(candidates)
+        judge = self._vote_shortcut_decision(candidates, votes, ctx.k)
+        if judge is None:
+            pending = self._reusable_speculation(speculation, candidates)
+            judge = pending.result() if pending is not None else self._call_judge(ctx, candidates, votes)
+        elif speculation is not None:
+            speculation.future.cancel()
 
-        user_query = state["user_query"]
+        if self._config.trace:
+            trace_judge(step=step, decision=judge)
+
+        return {"step": step, "judge": judge, "dynamic_k": next_k}
+
+    async def _anode_reason_and_judge(self, state: _State) -> Dict[str, Any]:
         step = state["step"] + 1
-        observations = state["observations"]
 
         # Step limit: ask judge for best-effort final (no more tools).
         if step > self._config.max_steps:
-            final_answer = self._best_effort_final(user_query=user_query, observations=observations)
-            return {**state, "step": step, "judge": final_answer}
+            final_answer = await self._abest_effort_final(
+                user_query=state["user_query"], observations=state["observations"]
+            )
+            return {"step": step, "judge": final_answer}
+
+        ctx = self._step_context(state, step)
+        speculation: Optional[_Speculation] = None
+        raw_candidates = self._plan_cache_get(ctx)
+        if raw_candidates is None:
+            if self._use_speculative_judge():
+                raw_candidates, speculation = await self._afan_out_speculative(ctx)
+            else:
+                raw_candidates = await self._afan_out_reasoners(ctx)
+        candidates = self._collect_candidates(ctx, raw_candidates)
+        self._plan_cache_put(ctx, candidates)
+        next_k = self._next_k(ctx, candidates)
+        candidates, votes = self._dedupe_candidates(candidates)
+        judge = self._vote_shortcut_decision(candidates, votes, ctx.k)
+        if judge is None:
+            pending = self._reusable_speculation(speculation, candidates)
+            judge = await pending if pending is not None else await self._acall_judge(ctx, candidates, votes)
+        elif speculation is not None:
+            speculation.future.cancel()
 
+        if self._config.trace:
+            trace_judge(step=step, decision=judge)
+
+        return {"step": step, "judge": judge, "dynamic_k": next_k}
+
+    def _step_context(self, state: _State, step: int) -> _StepContext:
+        tools = self._tools.all()
         state_summary = build_state_summary(
-            observations=observations, step_index=step, max_steps=self._config.max_steps
+            observations=state["observations"],
+            step_index=step,
+            max_steps=self._config.max_steps,
+            max_observation_chars=self._config.max_observation_chars,
+            rolling_summary=state.get("rolling_summary"),
+        )
+        return _StepContext(
+            user_query=state["user_query"],
+            step=step,
+            k=state.get("dynamic_k") or self._config.k_paths,
+            state_summary=state_summary,
+            tools=tools,
+            reasoner_system=self._reasoner_system,
+            reasoner_user_prefix=build_reasoner_user_prefix(user_query=state["user_query"], state_summary=state_summary),
+            reasoner_schema=self._reasoner_schema,
+            judge_schema=self._judge_schema,
         )
 
-        # --- K parallel reasoners (USC) ---
-        tools = self._tools.all()
-        # Build dynamic schema based on available tools to enforce valid args.
-        tool_schemas = [t.input_schema for t in tools]
-        reasoner_schema = get_reasoner_decision_schema(tool_schemas)
-        judge_schema = get_judge_decision_schema(tool_schemas)
-
-        def call_reasoner(path_id: int) -> Dict[str, Any]:
-            system, user = build_reasoner_prompt(
-                system_prompt=self._config.system_prompt,
-                user_query=user_query,
-                state_summary=state_summary,
-                tools=tools,
-                path_id=path_id,
-            )
-            try:
-                if self._config.use_structured_output:
-                    try:
-                        obj = invoke_chat_structured_obj(
-                            self._models.reasoner,
-                            system=system,
-                            user=user,
-                            schema=reasoner_schema,
-                        )
-                        obj = normalize_reasoner_decision_obj(obj)
-
-                        # If structured output omitted required tool args (common on some backends),
-                        # force fallback to the text+JSON path to give the model more guidance.
-                        cand, errs = validate_reasoner_decision_dict(obj)
-                        if not cand:
-                            raise ValueError(f"invalid structured reasoner decision: {errs}")
-                        if cand.decision_type == "TOOL_CALL":
-                            tool_name = cand.tool_name or ""
-                            tool = self._tools.get(tool_name)
-                            if not tool:
-                                raise ValueError(f"unknown tool in structured output: {tool_name!r}")
-                            args = cand.tool_args or {}
-                            arg_errors = validate_json_obj(args, tool.input_schema)
-                            if arg_errors:
-                                raise ValueError(f"invalid structured tool args: {arg_errors}")
-
-                        return obj
-                    except Exception as e:
-                        # Fall back to the legacy JSON parse path (some backends don't support structured output).
-                        if self._config.trace:
-                            print(
-                                f"  Reasoner[{path_id}] structured output failed; falling back to text JSON parsing: "
-                                f"{type(e).__name__}: {e}"
-                            )
-                        pass
-
-                raw_text = invoke_chat_text(self._models.reasoner, system=system, user=user)
+    # --- K parallel reasoners (USC) ---
+
+    def _reasoner_prompt(self, ctx: _StepContext, path_id: int) -> Tuple[str, str]:
+        tail = build_reasoner_user_tail(path_id if self._config.reasoner_path_ids else None)
+        return ctx.reasoner_system, ctx.reasoner_user_prefix + tail
+
+    def _call_reasoner(self, ctx: _StepContext, path_id: int) -> Dict[str, Any]:
+        with self._reasoner_slots:
+            return self._invoke_reasoner(ctx, path_id)
+
+    async def _acall_reasoner(self, ctx: _StepContext, path_id: int) -> Dict[str, Any]:
+        async with self._async_reasoner_slot():
+            return await self._ainvoke_reasoner(ctx, path_id)
+
+    def _async_reasoner_slot(self) -> Any:
+        import asyncio
+
+        limit = self._config.max_concurrent_reasoner_calls
+        if limit <= 0:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        slots = self._async_reasoner_slots.get(loop)
+        if slots is None:
+            slots = self._async_reasoner_slots[loop] = asyncio.Semaphore(limit)
+        return slots
+
+    def _invoke_reasoner(self, ctx: _StepContext, path_id: int) -> Dict[str, Any]:
+        system, user = self._reasoner_prompt(ctx, path_id)
+        try:
+            if self._config.use_structured_output:
                 try:
-                    obj = json_loads_object(raw_text)
-                    return normalize_reasoner_decision_obj(obj)
-                except Exception as parse_e:
-                    if self._config.trace:
-                        print(f"  Reasoner[{path_id}] non-JSON output preview: {truncate(raw_text, 400)}")
-                    raise parse_e
-            except Exception as e:
-                # Return a VALID ReasonerDecision shape even on failures so validation remains predictable.
-                return {
-                    "decision_type": "FINAL",
-                    "tool_name": None,
-                    "tool_args": None,
-                    "final_answer": "Reasoner failed to produce a valid JSON decision.",
-                    "brief_rationale": f"Reasoner call failed: {type(e).__name__}: {e}",
-                    "expected_signal": None,
-                }
+                    obj = invoke_chat_structured_obj(
+                        self._models.reasoner,
+                        system=system,
+                        user=user,
+                        schema=ctx.reasoner_schema,
+                        method=self._config.structured_output_method,
+                    )
+                    return self._accept_structured_reasoner(obj)
+                except Exception as e:
+                    # Fall back to the legacy JSON parse path (some backends don't support structured output).
+                    self._trace_structured_fallback(f"Reasoner[{path_id}]", e)
+
+            raw_text = invoke_chat_text(self._models.reasoner, system=system, user=user)
+            return self._parse_reasoner_text(raw_text, path_id)
+        except Exception as e:
+            # Return a VALID ReasonerDecision shape even on failures so validation remains predictable.
+            return _failed_reasoner_decision(e)
+
+    async def _ainvoke_reasoner(self, ctx: _StepContext, path_id: int) -> Dict[str, Any]:
+        system, user = self._reasoner_prompt(ctx, path_id)
+        try:
+            if self._config.use_structured_output:
+                try:
+                    obj = await ainvoke_chat_structured_obj(
+                        self._models.reasoner,
+                        system=system,
+                        user=user,
+                        schema=ctx.reasoner_schema,
+                        method=self._config.structured_output_method,
+                    )
+                    return self._accept_structured_reasoner(obj)
+                except Exception as e:
+                    # Fall back to the legacy JSON parse path (some backends don't support structured output).
+                    self._trace_structured_fallback(f"Reasoner[{path_id}]", e)
+
+            raw_text = await ainvoke_chat_text(self._models.reasoner, system=system, user=user)
+            return self._parse_reasoner_text(raw_text, path_id)
+        except Exception as e:
+            # Return a VALID ReasonerDecision shape even on failures so validation remains predictable.
+            return _failed_reasoner_decision(e)
+
+    def _accept_structured_reasoner(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        obj, cand, errs = self._normalized_reasoner(obj)
+
+        # If structured output omitted required tool args (common on some backends),
+        # force fallback to the text+JSON path to give the model more guidance.
+        if not cand:
+            raise ValueError(f"invalid structured reasoner decision: {errs}")
+        if cand.decision_type == "TOOL_CALL":
+            self._check_structured_tool_call(cand.tool_name, cand.tool_args)
+        return obj
+
+    def _parse_reasoner_text(self, raw_text: str, path_id: int) -> Dict[str, Any]:
+        try:
+            return self._normalized_reasoner(json_loads_object(raw_text))[0]
+        except Exception:
+            if self._config.trace:
+                print(f"  Reasoner[{path_id}] non-JSON output preview: {truncate(raw_text, 400)}")
+            raise
+
+    def _fan_out_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        from concurrent.futures import as_completed
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        if self._deterministic_paths() and ctx.k > 1:
+            return self._fan_out_reasoners(replace(ctx, k=1)) * ctx.k
+        if self._config.reasoner_sampling == "runnable_batch":
+            return self._batch_reasoners_with_timeout(ctx)
 
         raw_candidates: List[Dict[str, Any]] = []
-        with ThreadPoolExecutor(max_workers=min(32, self._config.k_paths)) as ex:
-            futures = [ex.submit(call_reasoner, i) for i in range(self._config.k_paths)]
-            # Vertex requests can occasionally exceed small timeouts. Instead of crashing the graph,
-            # we proceed with any completed candidates and mark unfinished ones as timeouts.
-            done, not_done = wait(futures, timeout=self._config.timeout_seconds)
+        if self._use_multi_candidate():
+            raw_candidates = self._sample_reasoners(ctx)
+        elif self._use_batched_prompt(ctx):
+            raw_candidates = self._batched_prompt_reasoners(ctx)
+        # Per-path requests for every candidate the multi-candidate/batched request did not produce.
+        path_ids = range(len(raw_candidates), ctx.k)
+        if not path_ids:
+            return raw_candidates
 
-            for f in done:
+        futures = [self._executor.submit(self._call_reasoner, ctx, i) for i in path_ids]
+        # Candidates are collected as they land (each is parsed/normalized in its worker thread).
+        # Vertex requests can occasionally exceed small timeouts. Instead of crashing the graph,
+        # we proceed with any completed candidates and mark unfinished ones as timeouts.
+        handled = set()
+        try:
+            for f in as_completed(futures, timeout=self._config.timeout_seconds):
+                handled.add(f)
                 try:
-                    raw_candidates.append(f.result(timeout=0))
+                    raw_candidates.append(f.result())  # already done: returns without waiting
                 except Exception as e:
-                    raw_candidates.append(
-                        {
-                            "decision_type": "FINAL",
-                            "tool_name": None,
-                            "tool_args": None,
-                            "final_answer": "Reasoner failed to produce a valid JSON decision.",
-                            "brief_rationale": f"Reasoner call failed: {type(e).__name__}: {e}",
-                            "expected_signal": None,
-                        }
-                    )
+                    raw_candidates.append(_failed_reasoner_decision(e))
+        except FutureTimeoutError:
+            # Return at the timeout instead of joining late reasoners: queued calls are cancelled, and
+            # running ones end at their own request deadline (see `make_chat_vertex_ai(timeout=...)`).
+            not_done = [f for f in futures if f not in handled]
+            for f in not_done:
+                f.cancel()
+            self._trace_reasoner_timeouts(len(not_done), len(futures))
+            for _ in not_done:
+                raw_candidates.append(self._timed_out_reasoner_decision())
+
+        return raw_candidates
+
+    async def _afan_out_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        import asyncio
+
+        if self._deterministic_paths() and ctx.k > 1:
+            return await self._afan_out_reasoners(replace(ctx, k=1)) * ctx.k
+        if self._config.reasoner_sampling == "runnable_batch":
+            try:
+                return await asyncio.wait_for(self._abatch_reasoners(ctx), timeout=self._config.timeout_seconds)
+            except asyncio.TimeoutError:
+                return self._batch_timed_out(ctx.k)
+
+        raw_candidates: List[Dict[str, Any]] = []
+        if self._use_multi_candidate():
+            raw_candidates = await self._asample_reasoners(ctx)
+        elif self._use_batched_prompt(ctx):
+            raw_candidates = await self._abatched_prompt_reasoners(ctx)
+        # Per-path requests for every candidate the multi-candidate/batched request did not produce.
+        path_ids = range(len(raw_candidates), ctx.k)
+        if not path_ids:
+            return raw_candidates
+
+        # Each path gets its own timeout; `wait_for` cancels the pending request instead of leaving it running.
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._acall_reasoner(ctx, i), timeout=self._config.timeout_seconds) for i in path_ids),
+            return_exceptions=True,
+        )
+
+        timed_out = 0
+        for r in results:
+            if isinstance(r, asyncio.TimeoutError):
+                timed_out += 1
+                raw_candidates.append(self._timed_out_reasoner_decision())
+            elif isinstance(r, BaseException):
+                raw_candidates.append(_failed_reasoner_decision(r))
+            else:
+                raw_candidates.append(r)
+
+        if timed_out:
+            self._trace_reasoner_timeouts(timed_out, len(results))
+        return raw_candidates
+
+    # --- Speculative judge (judge starts on the first ceil(K/2) candidates) ---
+
+    def _use_speculative_judge(self) -> bool:
+        return (
+            self._config.speculative_judge
+            and self._config.reasoner_sampling == "per_path"
+            and self._config.reasoner_path_ids
+            and self._config.k_paths > 1
+        )
+
+    def _fan_out_speculative(self, ctx: _StepContext) -> Tuple[List[Dict[str, Any]], Optional[_Speculation]]:
+        from concurrent.futures import as_completed
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        k = ctx.k
+        raw_candidates: List[Dict[str, Any]] = []
+        speculation: Optional[_Speculation] = None
+        futures = [self._executor.submit(self._call_reasoner, ctx, i) for i in range(k)]
+        handled = set()
+        try:
+            # Candidates are appended in completion order, so the judged ones stay a prefix.
+            for f in as_completed(futures, timeout=self._config.timeout_seconds):
+                handled.add(f)
+                try:
+                    raw_candidates.append(f.result())
+                except Exception as e:
+                    raw_candidates.append(_failed_reasoner_decision(e))
+                if speculation is None and len(raw_candidates) < k:
+                    partial = self._speculation_candidates(raw_candidates, k)
+                    if partial is not None:
+                        speculation = _Speculation(
+                            keys=frozenset(_candidate_key(c) for c in partial[0]),
+                            future=self._executor.submit(self._call_judge, ctx, *partial),
+                        )
+        except FutureTimeoutError:
+            not_done = [f for f in futures if f not in handled]
+            for f in not_done:
+                f.cancel()  # queued calls only; running ones end at their request deadline
+            self._trace_reasoner_timeouts(len(not_done), len(futures))
+            for _ in not_done:
+                raw_candidates.append(self._timed_out_reasoner_decision())
+        return raw_candidates, speculation
+
+    async def _afan_out_speculative(
+        self, ctx: _StepContext
+    ) -> Tuple[List[Dict[str, Any]], Optional[_Speculation]]:
+        import asyncio
 
-            if not_done:
-                for f in not_done:
-                    f.cancel()
-                if self._config.trace:
-                    print(f"  Reasoner timeout: {len(not_done)}/{len(futures)} candidates unfinished after {self._config.timeout_seconds}s")
-                for _ in not_done:
-                    raw_candidates.append(
-                        {
-                            "decision_type": "FINAL",
-                            "tool_name": None,
-                            "tool_args": None,
-                            "final_answer": "Reasoner timed out before producing a decision.",
-                            "brief_rationale": f"Reasoner call timed out after {self._config.timeout_seconds}s.",
-                            "expected_signal": None,
-                        }
+        k = ctx.k
+        raw_candidates: List[Dict[str, Any]] = []
+        speculation: Optional[_Speculation] = None
+        timed_out = 0
+        calls = [asyncio.wait_for(self._acall_reasoner(ctx, i), timeout=self._config.timeout_seconds) for i in range(k)]
+        for next_done in asyncio.as_completed(calls):
+            try:
+                raw_candidates.append(await next_done)
+            except asyncio.TimeoutError:
+                timed_out += 1
+                raw_candidates.append(self._timed_out_reasoner_decision())
+            except Exception as e:
+                raw_candidates.append(_failed_reasoner_decision(e))
+            if speculation is None and len(raw_candidates) < k:
+                partial = self._speculation_candidates(raw_candidates, k)
+                if partial is not None:
+                    speculation = _Speculation(
+                        keys=frozenset(_candidate_key(c) for c in partial[0]),
+                        future=asyncio.ensure_future(self._acall_judge(ctx, *partial)),
                     )
+        if timed_out:
+            self._trace_reasoner_timeouts(timed_out, k)
+        return raw_candidates, speculation
+
+    def _speculation_candidates(
+        self, raw_candidates: Sequence[Dict[str, Any]], k: int
+    ) -> Optional[Tuple[List[ReasonerDecision], Optional[List[int]]]]:
+        valid, _ = self._validate_candidates(raw_candidates)
+        if len(valid) < -(-k // 2):
+            return None
+        partial: Tuple[List[ReasonerDecision], Optional[List[int]]] = (valid, None)
+        if self._config.dedupe_candidates:
+            partial = _dedupe(valid)
+            # A single decision so far: the final set is either unanimous (judge skipped) or has new
+            # decisions (speculation discarded), so a speculative judge could never be used.
+            if len(partial[0]) == 1:
+                return None
+        if self._config.trace:
+            print(f"  Speculative judge started on {len(valid)}/{k} candidates")
+        return partial
+
+    def _reusable_speculation(
+        self, speculation: Optional[_Speculation], candidates: Sequence[ReasonerDecision]
+    ) -> Any:
+        """
+        Return the speculative judge's pending future if the final candidates add no decision it did
+        not see (late paths only added votes); otherwise cancel it and return None.
+        """
+        if speculation is None:
+            return None
+        if all(_candidate_key(c) in speculation.keys for c in candidates):
+            self._trace_speculation("kept", "late candidates only added votes")
+            return speculation.future
+        speculation.future.cancel()
+        self._trace_speculation("discarded", "late candidates changed the candidate set")
+        return None
+
+    def _trace_speculation(self, outcome: str, reason: str) -> None:
+        stats = self._speculation_stats
+        stats[outcome] += 1
+        if self._config.trace:
+            used = stats["kept"] + stats["discarded"]
+            print(f"  Speculative judge {outcome}: {reason} (hit rate {stats['kept']}/{used})")
+
+    # --- Runnable batch (K per-path prompts in one batch call) ---
+
+    def _batch_reasoners_with_timeout(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        future = self._executor.submit(self._batch_reasoners, ctx)
+        try:
+            return future.result(timeout=self._config.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            return self._batch_timed_out(ctx.k)
+
+    def _batch_concurrency(self, n: int) -> int:
+        # Runnable.batch worker bound: all n prompts at once, within max_concurrent_reasoner_calls.
+        limit = self._config.max_concurrent_reasoner_calls
+        return min(n, limit) if limit > 0 else n
+
+    def _batch_timed_out(self, k: int) -> List[Dict[str, Any]]:
+        self._trace_reasoner_timeouts(k, k)
+        return [self._timed_out_reasoner_decision() for _ in range(k)]
+
+    def _batch_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        k = ctx.k
+        prompts = [self._reasoner_prompt(ctx, i) for i in range(k)]
+        results: List[Optional[Dict[str, Any]]] = [None] * k
+        if self._config.use_structured_output:
+            try:
+                outs: Sequence[Any] = batch_invoke_chat_structured(
+                    self._models.reasoner,
+                    prompts,
+                    schema=ctx.reasoner_schema,
+                    method=self._config.structured_output_method,
+                    max_concurrency=self._batch_concurrency(k),
+                )
+            except Exception as e:
+                outs = [e] * k
+            self._accept_batched_structured(outs, results)
+
+        # Text JSON fallback, batched as well, for the paths structured output did not resolve.
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            try:
+                texts: Sequence[Any] = batch_invoke_chat_text(
+                    self._models.reasoner, [prompts[i] for i in pending], max_concurrency=self._batch_concurrency(len(pending))
+                )
+            except Exception as e:
+                texts = [e] * len(pending)
+            self._accept_batched_texts(pending, texts, results)
+        return cast(List[Dict[str, Any]], results)
+
+    async def _abatch_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        k = ctx.k
+        prompts = [self._reasoner_prompt(ctx, i) for i in range(k)]
+        results: List[Optional[Dict[str, Any]]] = [None] * k
+        if self._config.use_structured_output:
+            try:
+                outs: Sequence[Any] = await abatch_invoke_chat_structured(
+                    self._models.reasoner,
+                    prompts,
+                    schema=ctx.reasoner_schema,
+                    method=self._config.structured_output_method,
+                    max_concurrency=self._batch_concurrency(k),
+                )
+            except Exception as e:
+                outs = [e] * k
+            self._accept_batched_structured(outs, results)
+
+        # Text JSON fallback, batched as well, for the paths structured output did not resolve.
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            try:
+                texts: Sequence[Any] = await abatch_invoke_chat_text(
+                    self._models.reasoner, [prompts[i] for i in pending], max_concurrency=self._batch_concurrency(len(pending))
+                )
+            except Exception as e:
+                texts = [e] * len(pending)
+            self._accept_batched_texts(pending, texts, results)
+        return cast(List[Dict[str, Any]], results)
+
+    def _accept_batched_structured(self, outs: Sequence[Any], results: List[Optional[Dict[str, Any]]]) -> None:
+        for i, out in enumerate(outs):
+            try:
+                if isinstance(out, Exception):
+                    raise out
+                results[i] = self._accept_structured_reasoner(out)
+            except Exception as e:
+                # Left as None: retried through the text JSON path.
+                self._trace_structured_fallback(f"Reasoner[{i}]", e)
+
+    def _accept_batched_texts(
+        self, path_ids: Sequence[int], texts: Sequence[Any], results: List[Optional[Dict[str, Any]]]
+    ) -> None:
+        for i, text in zip(path_ids, texts):
+            results[i] = _failed_reasoner_decision(text) if isinstance(text, Exception) else self._parse_sampled_reasoner(text, i)
+
+    # --- Multi-candidate sampling (one request, n=k_paths) ---
+
+    def _deterministic_paths(self) -> bool:
+        # Identical prompts (no PATH_ID) at temperature 0: the K paths would return the same decision,
+        # so one request is sampled and counted K times (which also lets the unanimous shortcut skip the judge).
+        return not self._config.reasoner_path_ids and self._config.reasoner_model.temperature == 0
+
+    def _use_multi_candidate(self) -> bool:
+        if self._deterministic_paths():
+            return False
+        sampling = self._config.reasoner_sampling
+        # Without PATH_ID the K per-path prompts are identical: sample them from one prefill instead.
+        shared_prompt = sampling == "per_path" and not self._config.reasoner_path_ids
+        return (sampling == "multi_candidate" or shared_prompt) and self._config.k_paths > 1
+
+    def _sample_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        """
+        Sample up to K reasoner candidates with a single `n=k_paths` request.
+
+        Returns [] if the backend rejects `n`, so the caller falls back to per-path requests.
+        """
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        system, user = self._reasoner_prompt(ctx, 0)
+        k = ctx.k
+        future = self._executor.submit(generate_chat_texts, self._models.reasoner, system=system, user=user, n=k)
+        try:
+            texts = future.result(timeout=self._config.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            self._trace_reasoner_timeouts(k, k)
+            return [self._timed_out_reasoner_decision() for _ in range(k)]
+        except Exception as e:
+            self._trace_multi_candidate_fallback(e)
+            return []
+        return [self._parse_sampled_reasoner(text, i) for i, text in enumerate(texts[:k])]
+
+    async def _asample_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        import asyncio
+
+        system, user = self._reasoner_prompt(ctx, 0)
+        k = ctx.k
+        try:
+            texts = await asyncio.wait_for(
+                agenerate_chat_texts(self._models.reasoner, system=system, user=user, n=k),
+                timeout=self._config.timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            self._trace_reasoner_timeouts(k, k)
+            return [self._timed_out_reasoner_decision() for _ in range(k)]
+        except Exception as e:
+            self._trace_multi_candidate_fallback(e)
+            return []
+        return [self._parse_sampled_reasoner(text, i) for i, text in enumerate(texts[:k])]
+
+    def _parse_sampled_reasoner(self, raw_text: str, path_id: int) -> Dict[str, Any]:
+        try:
+            return self._parse_reasoner_text(raw_text, path_id)
+        except Exception as e:
+            return _failed_reasoner_decision(e)
+
+    def _trace_multi_candidate_fallback(self, e: Exception, request: str = "multi-candidate") -> None:
+        if self._config.trace:
+            print(f"  Reasoner {request} request failed; falling back to per-path calls: {type(e).__name__}: {e}")
 
+    # --- Batched prompt (all K paths in one request, answered as a JSON array) ---
+
+    def _use_batched_prompt(self, ctx: _StepContext) -> bool:
+        return self._config.reasoner_sampling == "batched_prompt" and ctx.k > 1
+
+    def _batched_prompt(self, ctx: _StepContext) -> Tuple[str, str]:
+        return self._reasoner_batch_system, ctx.reasoner_user_prefix + build_reasoner_batch_tail(ctx.k)
+
+    def _batched_prompt_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        """
+        Ask for the K candidates in one request (a JSON array, one decision per PATH_ID).
+
+        Returns [] if the request fails or its output is not an array, so the caller falls back to
+        per-path requests; paths missing from a short array are filled by per-path requests too.
+        """
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        system, user = self._batched_prompt(ctx)
+        k = ctx.k
+        future = self._executor.submit(invoke_chat_text, self._models.reasoner, system=system, user=user)
+        try:
+            raw_text = future.result(timeout=self._config.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            self._trace_reasoner_timeouts(k, k)
+            return [self._timed_out_reasoner_decision() for _ in range(k)]
+        except Exception as e:
+            self._trace_multi_candidate_fallback(e, "batched-prompt")
+            return []
+        return self._parse_batched_reasoners(raw_text, k)
+
+    async def _abatched_prompt_reasoners(self, ctx: _StepContext) -> List[Dict[str, Any]]:
+        import asyncio
+
+        system, user = self._batched_prompt(ctx)
+        k = ctx.k
+        try:
+            raw_text = await asyncio.wait_for(
+                ainvoke_chat_text(self._models.reasoner, system=system, user=user),
+                timeout=self._config.timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            self._trace_reasoner_timeouts(k, k)
+            return [self._timed_out_reasoner_decision() for _ in range(k)]
+        except Exception as e:
+            self._trace_multi_candidate_fallback(e, "batched-prompt")
+            return []
+        return self._parse_batched_reasoners(raw_text, k)
+
+    def _parse_batched_reasoners(self, raw_text: str, k: int) -> List[Dict[str, Any]]:
+        try:
+            items = json_loads_array(raw_text)
+        except Exception as e:
+            if self._config.trace:
+                print(f"  Reasoner batched output preview: {truncate(raw_text, 400)}")
+            self._trace_multi_candidate_fallback(e, "batched-prompt")
+            return []
+        raw_candidates: List[Dict[str, Any]] = []
+        for item in items[:k]:
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError(f"Expected JSON object, got {type(item).__name__}")
+                raw_candidates.append(self._normalized_reasoner(item)[0])
+            except Exception as e:
+                raw_candidates.append(_failed_reasoner_decision(e))
+        return raw_candidates
+
+    def _timed_out_reasoner_decision(self) -> Dict[str, Any]:
+        return {
+            "decision_type": "FINAL",
+            "tool_name": None,
+            "tool_args": None,
+            "final_answer": _REASONER_TIMED_OUT_ANSWER,
+            "brief_rationale": f"Reasoner call timed out after {self._config.timeout_seconds}s.",
+            "expected_signal": None,
+        }
+
+    def _trace_reasoner_timeouts(self, unfinished: int, total: int) -> None:
+        if self._config.trace:
+            print(
+                f"  Reasoner timeout: {unfinished}/{total} candidates unfinished "
+                f"after {self._config.timeout_seconds}s"
+            )
+
+    def _collect_candidates(
+        self, ctx: _StepContext, raw_candidates: Sequence[Dict[str, Any]]
+    ) -> List[ReasonerDecision]:
         candidates, invalid = self._validate_candidates(raw_candidates)
         if self._config.trace:
-            trace_candidates(step=step, k=self._config.k_paths, valid=candidates, invalid=invalid)
+            trace_candidates(step=ctx.step, k=ctx.k, valid=candidates, invalid=invalid)
+        return candidates
 
-        # --- Judge ---
-        system, user = build_judge_prompt(
-            user_query=user_query,
-            state_summary=state_summary,
+    def _dedupe_candidates(
+        self, candidates: Sequence[ReasonerDecision]
+    ) -> Tuple[List[ReasonerDecision], Optional[List[int]]]:
+        """
+        Collapse identical candidates (first occurrence kept, in order) and count their votes.
+        Returns `votes=None` when deduplication is disabled.
+        """
+        if not self._config.dedupe_candidates:
+            return list(candidates), None
+        unique, votes = _dedupe(candidates)
+        if self._config.trace and len(unique) < len(candidates):
+            print(f"  Deduplicated candidates: {len(candidates)} -> {len(unique)} (votes={votes})")
+        return unique, votes
+
+    def _vote_shortcut_decision(
+        self, candidates: Sequence[ReasonerDecision], votes: Optional[Sequence[int]], k: int
+    ) -> Optional[JudgeDecision]:
+        """
+        Decide locally when the reasoner paths already agree (USC's self-consistency premise):
+          - always, if every real candidate is the same decision with >= ceil(K/2) votes;
+          - with `enable_vote_shortcut`, if one cluster (near-identical FINAL answers merged)
+            holds >= ceil(K/2) votes and no other cluster ties it.
+        Never under "synthesize_one": that strategy asks the judge for a synthesized decision
+        (selected_index null), which copying a candidate would silently bypass.
+        Failed/timed-out placeholders never win a shortcut, but still count toward K in the quorum.
+        Returns None when the judge should run.
+        """
+        if votes is None or not candidates or self._config.selection_strategy == "synthesize_one":
+            return None
+        real = [i for i, c in enumerate(candidates) if not _is_placeholder(c)]
+        if not real:
+            return None
+        quorum = -(-k // 2)
+        if len(real) == 1:
+            idx, count, label = real[0], votes[real[0]], "unanimous"
+        elif self._config.enable_vote_shortcut:
+            clusters = self._vote_clusters(candidates, votes, real)
+            clusters.sort(key=lambda c: c[1], reverse=True)
+            (idx, count), runner_up = clusters[0], clusters[1][1] if len(clusters) > 1 else 0
+            if count == runner_up:
+                return None
+            label = "majority"
+        else:
+            return None
+        if count < quorum:
+            return None
+        c = candidates[idx]
+        if self._config.trace:
+            print(f"  Judge skipped: {count}/{k} reasoner paths agree ({label})")
+        return JudgeDecision(
+            decision_type=c.decision_type,
+            selected_index=idx,
+            tool_name=c.tool_name,
+            tool_args=c.tool_args,
+            final_answer=c.final_answer,
+            justification=f"{label}: {count}/{k} reasoner paths proposed this decision",
+        )
+
+    def _vote_clusters(
+        self, candidates: Sequence[ReasonerDecision], votes: Sequence[int], indices: Sequence[int]
+    ) -> List[List[int]]:
+        # [representative index, total votes] over candidates[indices] (the real ones: placeholders of
+        # failed/timed-out paths never form a cluster); the representative is the most-voted member.
+        clusters: List[List[int]] = []
+        for i in indices:
+            c = candidates[i]
+            for cluster in clusters:
+                rep = candidates[cluster[0]]
+                if c.decision_type == "FINAL" and rep.decision_type == "FINAL" and self._similar_answers(
+                    c.final_answer or "", rep.final_answer or ""
+                ):
+                    if votes[i] > votes[cluster[0]]:
+                        cluster[0] = i
+                    cluster[1] += votes[i]
+                    break
+            else:
+                clusters.append([i, votes[i]])
+        return clusters
+
+    def _similar_answers(self, a: str, b: str) -> bool:
+        threshold = self._config.vote_shortcut_similarity
+        m = SequenceMatcher(None, a.strip(), b.strip(), autojunk=False)
+        # Cheap upper bounds first; the full ratio is quadratic in the answer length.
+        return m.real_quick_ratio() >= threshold and m.quick_ratio() >= threshold and m.ratio() >= threshold
+
+    def _next_k(self, ctx: _StepContext, candidates: Sequence[ReasonerDecision]) -> int:
+        """
+        Adaptive K: sample only `max(adaptive_k_min, 3)` paths next step if the largest group of
+        identical candidates holds at least `adaptive_k_agreement` of this step's K paths, else k_paths.
+        Invalid/timed-out paths count against agreement, so a noisy step restores the full K.
+        """
+        k_full = self._config.k_paths
+        k_low = max(self._config.adaptive_k_min, 3)
+        if self._config.adaptive_k_min <= 0 or k_low >= k_full:
+            return k_full
+        # Placeholders of failed/timed-out paths are dropped before grouping (identical placeholders would
+        # otherwise form one large "agreeing" group); they still count in the ctx.k denominator.
+        real = [c for c in candidates if not _is_placeholder(c)]
+        votes = _dedupe(real)[1] if real else [0]
+        next_k = k_low if max(votes) / ctx.k >= self._config.adaptive_k_agreement else k_full
+        if self._config.trace and next_k != ctx.k:
+            print(f"  Adaptive K: {ctx.k} -> {next_k} reasoner paths for the next step")
+        return next_k
+
+    # --- Plan cache ---
+
+    def _plan_cache_key(self, ctx: _StepContext) -> bytes:
+        payload = safe_json_dumps(
+            {
+                "sys": self._config.system_prompt,
+                "query": ctx.user_query,
+                "tools": sorted(t.name for t in ctx.tools),
+                "state": ctx.state_summary,
+            }
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    def _plan_cache_get(self, ctx: _StepContext) -> Optional[List[Dict[str, Any]]]:
+        if self._config.plan_cache_size <= 0:
+            return None
+        key = self._plan_cache_key(ctx)
+        with self._plan_cache_lock:
+            cached = self._plan_cache.get(key)
+            if cached is None:
+                return None
+            self._plan_cache.move_to_end(key)
+        if self._config.trace:
+            print(f"  Plan cache hit: reusing {len(cached)} reasoner candidates")
+        # Copies: cached candidates are re-validated like fresh ones, and must not be mutated in place.
+        return [dict(c) for c in cached]
+
+    def _plan_cache_put(self, ctx: _StepContext, candidates: Sequence[ReasonerDecision]) -> None:
+        # Only real decisions are cached: failed/timed-out placeholders are dropped, and a step where no path
+        # produced a real decision is not cached at all, so it is re-sampled next time.
+        if self._config.plan_cache_size <= 0:
+            return
+        real = [reasoner_decision_to_json(c) for c in candidates if not _is_placeholder(c)]
+        if not real:
+            return
+        key = self._plan_cache_key(ctx)
+        with self._plan_cache_lock:
+            self._plan_cache[key] = real
+            while len(self._plan_cache) > self._config.plan_cache_size:
+                self._plan_cache.popitem(last=False)
+
+    # --- Judge cache ---
+
+    def _judge_cache_key(self, system: str, user: str) -> Optional[bytes]:
+        if self._config.judge_cache_size <= 0:
+            return None
+        return hashlib.blake2b(f"{system}\x00{user}".encode("utf-8"), digest_size=16).digest()
+
+    def _judge_cache_get(self, key: Optional[bytes]) -> Optional[JudgeDecision]:
+        if key is None:
+            return None
+        with self._judge_cache_lock:
+            cached = self._judge_cache.get(key)
+            if cached is None:
+                return None
+            self._judge_cache.move_to_end(key)
+        if self._config.trace:
+            print("  Judge cache hit: reusing decision for identical judge prompt")
+        # JudgeDecision is frozen, so the cached instance can be shared.
+        return cached
+
+    def _judge_cache_put(self, key: Optional[bytes], judge: JudgeDecision) -> None:
+        # Only validated decisions are cached; failures are retried next time.
+        if key is None:
+            return
+        with self._judge_cache_lock:
+            self._judge_cache[key] = judge
+            while len(self._judge_cache) > self._config.judge_cache_size:
+                self._judge_cache.popitem(last=False)
+
+    # --- Judge ---
+
+    def _judge_prompt(
+        self, ctx: _StepContext, candidates: Sequence[ReasonerDecision], votes: Optional[Sequence[int]] = None
+    ) -> Tuple[str, str]:
+        user = build_judge_user(
+            user_query=ctx.user_query,
+            state_summary=ctx.state_summary,
             candidates=candidates,
-            tools=tools,
-            config=self._config,
+            votes=votes,
+            char_budget=self._config.judge_candidate_char_budget,
         )
+        return self._judge_system, user
+
+    def _call_judge(
+        self, ctx: _StepContext, candidates: Sequence[ReasonerDecision], votes: Optional[Sequence[int]] = None
+    ) -> JudgeDecision:
+        system, user = self._judge_prompt(ctx, candidates, votes)
+        cache_key = self._judge_cache_key(system, user)
+        cached = self._judge_cache_get(cache_key)
+        if cached is not None:
+            return self._untruncate_judge(cached, candidates)
         try:
             if self._config.use_structured_output:
                 try:
-                    judge_raw = normalize_judge_decision_obj(
+                    judge_raw = self._accept_structured_judge(
                         invoke_chat_structured_obj(
                             self._models.judge,
                             system=system,
                             user=user,
-                            schema=judge_schema,
+                            schema=ctx.judge_schema,
+                            method=self._config.structured_output_method,
                         )
                     )
-                    # If structured output omitted required tool args / tool_name, force fallback to text+JSON.
-                    judge_obj, judge_errs = validate_judge_decision_dict(judge_raw)
-                    if not judge_obj:
-                        raise ValueError(f"invalid structured judge decision: {judge_errs}")
-                    if judge_obj.decision_type == "TOOL_CALL":
-                        tool_name = judge_obj.tool_name or ""
-                        tool = self._tools.get(tool_name)
-                        if not tool:
-                            raise ValueError(f"unknown tool in structured output: {tool_name!r}")
-                        args = judge_obj.tool_args or {}
-                        arg_errors = validate_json_obj(args, tool.input_schema)
-                        if arg_errors:
-                            raise ValueError(f"invalid structured tool args: {arg_errors}")
                 except Exception as e:
                     # Fall back to the legacy JSON parse path (some backends don't support structured output).
-                    if self._config.trace:
-                        print(
-                            "  Judge structured output failed; falling back to text JSON parsing: "
-                            f"{type(e).__name__}: {e}"
-                        )
-                    judge_raw = {}
-            else:
-                judge_raw = {}
+                    self._trace_structured_fallback("Judge", e)
+                else:
+                    # Structured output succeeded: no text call.
+                    return self._finalize_judge(judge_raw, cache_key, candidates)
+
+            judge_raw = self._parse_judge_text(self._judge_text(system, user))
+            return self._finalize_judge(judge_raw, cache_key, candidates)
+        except Exception as e:
+            # Never crash the graph on a judge parsing failure; stop with a clear final message.
+            return _failed_judge_decision(e)
 
-            if not judge_raw:
-                judge_text = invoke_chat_text(self._models.judge, system=system, user=user)
+    async def _acall_judge(
+        self, ctx: _StepContext, candidates: Sequence[ReasonerDecision], votes: Optional[Sequence[int]] = None
+    ) -> JudgeDecision:
+        system, user = self._judge_prompt(ctx, candidates, votes)
+        cache_key = self._judge_cache_key(system, user)
+        cached = self._judge_cache_get(cache_key)
+        if cached is not None:
+            return self._untruncate_judge(cached, candidates)
+        try:
+            if self._config.use_structured_output:
                 try:
-                    judge_raw = normalize_judge_decision_obj(json_loads_object(judge_text))
-                except Exception as parse_e:
-                    if self._config.trace:
-                        print(f"  Judge non-JSON output preview: {truncate(judge_text, 600)}")
-                    raise parse_e
-
-            judge, errors = validate_judge_decision_dict(judge_raw)
-            if not judge:
-                if self._config.trace:
-                    print(f"  Judge invalid JSON (post-normalization): {truncate(safe_json_dumps(judge_raw), 800)}")
-                judge = JudgeDecision(
-                    decision_type="FINAL",
-                    selected_index=None,
-                    tool_name=None,
-                    tool_args=None,
-                    final_answer="Judge produced invalid output; cannot continue.",
-                    justification=f"invalid judge output: {errors}",
-                )
+                    judge_raw = self._accept_structured_judge(
+                        await ainvoke_chat_structured_obj(
+                            self._models.judge,
+                            system=system,
+                            user=user,
+                            schema=ctx.judge_schema,
+                            method=self._config.structured_output_method,
+                        )
+                    )
+                except Exception as e:
+                    # Fall back to the legacy JSON parse path (some backends don't support structured output).
+                    self._trace_structured_fallback("Judge", e)
+                else:
+                    # Structured output succeeded: no text call.
+                    return self._finalize_judge(judge_raw, cache_key, candidates)
+
+            judge_raw = self._parse_judge_text(await self._ajudge_text(system, user))
+            return self._finalize_judge(judge_raw, cache_key, candidates)
         except Exception as e:
             # Never crash the graph on a judge parsing failure; stop with a clear final message.
-            judge = JudgeDecision(
-                decision_type="FINAL",
-                selected_index=None,
-                tool_name=None,
-                tool_args=None,
-                final_answer="Judge failed to produce a valid JSON decision; stopping.",
-                justification=f"Judge call failed: {type(e).__name__}: {e}",
-            )
+            return _failed_judge_decision(e)
+
+    def _judge_text(self, system: str, user: str) -> str:
+        # Text JSON judge call; with stream_judge, reading stops at the end of the JSON object.
+        if self._config.stream_judge:
+            return stream_chat_json_text(self._models.judge, system=system, user=user)
+        return invoke_chat_text(self._models.judge, system=system, user=user)
 
+    async def _ajudge_text(self, system: str, user: str) -> str:
+        if self._config.stream_judge:
+            return await astream_chat_json_text(self._models.judge, system=system, user=user)
+        return await ainvoke_chat_text(self._models.judge, system=system, user=user)
+
+    def _accept_structured_judge(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        judge_raw, judge_obj, judge_errs = self._normalized_judge(obj)
+        # If structured output omitted required tool args / tool_name, force fallback to text+JSON.
+        if not judge_obj:
+            raise ValueError(f"invalid structured judge decision: {judge_errs}")
+        if judge_obj.decision_type == "TOOL_CALL":
+            self._check_structured_tool_call(judge_obj.tool_name, judge_obj.tool_args)
+        return judge_raw
+
+    def _parse_judge_text(self, judge_text: str) -> Dict[str, Any]:
+        try:
+            return self._normalized_judge(json_loads_object(judge_text))[0]
+        except Exception:
+            if self._config.trace:
+                print(f"  Judge non-JSON output preview: {truncate(judge_text, 600)}")
+            raise
+
+    def _finalize_judge(
+        self,
+        judge_raw: Dict[str, Any],
+        cache_key: Optional[bytes] = None,
+        candidates: Sequence[ReasonerDecision] = (),
+    ) -> JudgeDecision:
+        judge, errors = validate_judge_decision_dict(judge_raw)
+        if judge:
+            # Cached as the judge answered (the key is the truncated prompt); restored per call.
+            self._judge_cache_put(cache_key, judge)
+            return self._untruncate_judge(judge, candidates)
         if self._config.trace:
-            trace_judge(step=step, decision=judge)
+            print(f"  Judge invalid JSON (post-normalization): {preview_json(judge_raw, 800)}")
+        return JudgeDecision(
+            decision_type="FINAL",
+            selected_index=None,
+            tool_name=None,
+            tool_args=None,
+            final_answer="Judge produced invalid output; cannot continue.",
+            justification=f"invalid judge output: {errors}",
+            failed=True,
+        )
+
+    def _untruncate_judge(self, judge: JudgeDecision, candidates: Sequence[ReasonerDecision]) -> JudgeDecision:
+        # With judge_candidate_char_budget, a judge that copies the selected candidate copies its truncated
+        # text/args: put the candidate's full values back (only where they match the truncated view exactly).
+        budget = self._config.judge_candidate_char_budget
+        idx = judge.selected_index
+        if budget <= 0 or idx is None or not 0 <= idx < len(candidates):
+            return judge
+        cand = candidates[idx]
+        if cand.decision_type != judge.decision_type:
+            return judge
+        shown = judge_candidate_json(cand, budget)
+        changes: Dict[str, Any] = {}
+        if judge.final_answer and judge.final_answer == shown["final_answer"] != cand.final_answer:
+            changes["final_answer"] = cand.final_answer
+        if judge.tool_args and judge.tool_args == shown["tool_args"] != cand.tool_args:
+            changes["tool_args"] = cand.tool_args
+        return replace(judge, **changes) if changes else judge
 
-        return {**state, "step": step, "judge": judge}
+    # --- Normalization (only for outputs that fail validation) ---
 
-    def _node_execute_tool(self, state: _State) -> _State:
+    def _normalized_reasoner(
+        self, obj: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[ReasonerDecision], List[str]]:
+        """
+        Validate first; run `normalize_reasoner_decision_obj` only if the object is invalid
+        or names an unknown tool (e.g. an alias). Structured output is usually valid as-is.
+        """
+        self._normalize_stats["reasoner"] += 1
+        cand, errs = validate_reasoner_decision_dict(obj)
+        if cand is None or not self._is_known_decision(cand.decision_type, cand.tool_name):
+            obj = normalize_reasoner_decision_obj(obj)
+            cand, errs = validate_reasoner_decision_dict(obj)
+            self._trace_normalized("reasoner")
+        return obj, cand, errs
+
+    def _normalized_judge(self, obj: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[JudgeDecision], List[str]]:
+        self._normalize_stats["judge"] += 1
+        judge, errs = validate_judge_decision_dict(obj)
+        if judge is None or not self._is_known_decision(judge.decision_type, judge.tool_name):
+            obj = normalize_judge_decision_obj(obj)
+            judge, errs = validate_judge_decision_dict(obj)
+            self._trace_normalized("judge")
+        return obj, judge, errs
+
+    def _is_known_decision(self, decision_type: str, tool_name: Optional[str]) -> bool:
+        return decision_type != "TOOL_CALL" or self._tools.get(tool_name or "") is not None
+
+    def _trace_normalized(self, role: str) -> None:
+        self._normalize_stats[f"{role}_normalized"] += 1
+        if self._config.trace:
+            print(
+                f"  {role.capitalize()} output normalized "
+                f"({self._normalize_stats[f'{role}_normalized']}/{self._normalize_stats[role]} so far)"
+            )
+
+    def _check_structured_tool_call(self, tool_name: Optional[str], tool_args: Optional[Dict[str, Any]]) -> None:
+        tool = self._tools.get(tool_name or "")
+        if not tool:
+            raise ValueError(f"unknown tool in structured output: {tool_name!r}")
+        arg_errors = self._tools.validate_args(tool.name, tool_args or {})
+        if arg_errors:
+            raise ValueError(f"invalid structured tool args: {arg_errors}")
+
+    def _trace_structured_fallback(self, who: str, e: Exception) -> None:
+        if self._config.trace:
+            print(f"  {who} structured output failed; falling back to text JSON parsing: {type(e).__name__}: {e}")
+
+    def _node_execute_tool(self, state: _State) -> Dict[str, Any]:
         judge = state.get("judge")
         if not judge or judge.decision_type != "TOOL_CALL" or not judge.tool_name:
-            return state
+            return {}
+        tool, args, obs = self._checked_tool_call(judge)
+        if tool is not None:
+            try:
+                result = self._run_tool(tool, args, state["user_query"])
+            except Exception as e:
+                obs = self._tool_exception_observation(tool, e)
+            else:
+                obs = self._tool_result_observation(tool, result)
+        return self._observation_update(state, obs)
 
-        tool = self._tools.get(judge.tool_name)
-        if tool is None:
-            obs = f"Tool error: unknown tool '{judge.tool_name}'"
-            return {**state, "observations": state["observations"] + [obs]}
+    async def _anode_execute_tool(self, state: _State) -> Dict[str, Any]:
+        """
+        Async variant of `_node_execute_tool`: coroutine tools are awaited, sync tools (and the retry plugin)
+        run in the default thread pool, so tool I/O never blocks the event loop shared with other runs.
+        """
+        judge = state.get("judge")
+        if not judge or judge.decision_type != "TOOL_CALL" or not judge.tool_name:
+            return {}
+        tool, args, obs = self._checked_tool_call(judge)
+        if tool is not None:
+            try:
+                result = await self._arun_tool(tool, args, state["user_query"])
+            except Exception as e:
+                obs = self._tool_exception_observation(tool, e)
+            else:
+                obs = self._tool_result_observation(tool, result)
+        return await self._aobservation_update(state, obs)
 
+    def _checked_tool_call(self, judge: JudgeDecision) -> Tuple[Optional[ToolSpec], Dict[str, Any], str]:
+        # (tool, args, "") for a runnable call; (None, args, observation) if it cannot run.
+        tool = self._tools.get(judge.tool_name or "")
         args = judge.tool_args or {}
-        arg_errors = validate_json_obj(args, tool.input_schema)
+        if tool is None:
+            return None, args, f"Tool error: unknown tool '{judge.tool_name}'"
+        arg_errors = self._tools.validate_args(tool.name, args)
         if arg_errors:
-            obs = f"{tool.name} => invalid_args: {arg_errors} args={safe_json_dumps(args)}"
-            return {**state, "observations": state["observations"] + [obs]}
+            return None, args, f"{tool.name} => invalid_args: {arg_errors} args={safe_json_dumps(args)}"
+        if self._config.trace:
+            print(f"  Tool call: {tool.name} args={preview_json(args, 220)}")
+        return tool, args, ""
+
+    def _run_tool(self, tool: ToolSpec, args: Dict[str, Any], user_query: str) -> Any:
+        if self._retry_plugin:
+            # Use the retry plugin to execute with reflection loop
+            return self._retry_plugin.run(
+                tool_name=tool.name,
+                tool_args=args,
+                tool_func=functools.partial(_call_tool_func, tool.func),
+                all_tools=self._tools.all(),
+                user_query=user_query,
+                tool_input_schema=tool.input_schema,
+                tool_validator=self._tools.validator(tool.name),
+                executor=self._executor,  # speculative retries share the agent's worker threads
+            )
+        return _call_tool_func(tool.func, args)
+
+    async def _arun_tool(self, tool: ToolSpec, args: Dict[str, Any], user_query: str) -> Any:
+        if self._retry_plugin is None:
+            return await _acall_tool_func(tool.func, args)
+        # Async retry loop: WAIT backoffs and reflection calls yield to the event loop instead of a thread.
+        return await self._retry_plugin.run_async(
+            tool_name=tool.name,
+            tool_args=args,
+            tool_func=functools.partial(_acall_tool_func, tool.func),
+            all_tools=self._tools.all(),
+            user_query=user_query,
+            tool_input_schema=tool.input_schema,
+            tool_validator=self._tools.validator(tool.name),
+        )
+
+    def _tool_result_observation(self, tool: ToolSpec, result: Any) -> str:
+        # Check for special abort signal from reflection
+        if isinstance(result, str) and result.startswith("Reflection Error:"):
+            if self._config.trace:
+                print(f"  Tool reflection abort: {result}")
+            return self._capped_observation(tool, result)
+
+        # Serialize only what the agent can see: tool_result_max_chars when observations are
+        # truncated, else up to the hard observation cap.
+        agent_max = self._config.tool_result_max_chars if self._config.truncate_agent_observations else 0
+        budget = agent_max if agent_max > 0 else _OBSERVATION_HARD_MAX_CHARS - len(tool.name) - 4
+        rendered_full, cut = bounded_json_dumps(result, budget)
+        if cut and agent_max <= 0:
+            self._trace_observation_capped(tool.name, "serialized result")
+
+        # Truncate for terminal trace if a limit is set
+        if self._config.tool_result_max_chars > 0:
+            rendered_trace = truncate(rendered_full, self._config.tool_result_max_chars)
+        else:
+            rendered_trace = rendered_full
 
         if self._config.trace:
-            print(f"  Tool call: {tool.name} args={truncate(safe_json_dumps(args), 220)}")
-        try:
-            if self._retry_plugin:
-                # Use the retry plugin to execute with reflection loop
-                result = self._retry_plugin.run(
-                    tool_name=tool.name,
-                    tool_args=args,
-                    tool_func=tool.func,
-                    all_tools=self._tools.all(),
-                    user_query=state["user_query"],
-                    tool_input_schema=tool.input_schema,
-                )
-            else:
-                result = tool.func(args)
+            print(f"  Tool result: {tool.name} => {rendered_trace}")
 
-            # Check for special abort signal from reflection
-            if isinstance(result, str) and result.startswith("Reflection Error:"):
-                 obs = result
-                 if self._config.trace:
-                    print(f"  Tool reflection abort: {obs}")
-            else:
-                rendered_full = safe_json_dumps(result)
-                
-                # Truncate for terminal trace if a limit is set
-                if self._config.tool_result_max_chars > 0:
-                    rendered_trace = truncate(rendered_full, self._config.tool_result_max_chars)
-                else:
-                    rendered_trace = rendered_full
-
-                if self._config.trace:
-                    print(f"  Tool result: {tool.name} => {rendered_trace}")
-                
-                # Truncate for agent observation only if explicitly enabled
-                if self._config.truncate_agent_observations and self._config.tool_result_max_chars > 0:
-                    obs = f"{tool.name} => {rendered_trace}"
-                else:
-                    obs = f"{tool.name} => {rendered_full}"
+        return self._capped_observation(tool, f"{tool.name} => {rendered_full}")
+
+    def _tool_exception_observation(self, tool: ToolSpec, e: Exception) -> str:
+        msg = f"{type(e).__name__}: {e}"
+        # Truncate exception messages for trace only
+        if self._config.tool_result_max_chars > 0:
+            msg_trace = truncate(msg, self._config.tool_result_max_chars)
+        else:
+            msg_trace = msg
+
+        if self._config.trace:
+            print(f"  Tool exception: {tool.name} => {msg_trace}")
+
+        # Truncate exception for agent observation only if explicitly enabled
+        if self._config.truncate_agent_observations and self._config.tool_result_max_chars > 0:
+            return self._capped_observation(tool, f"{tool.name} => tool_exception: {msg_trace}")
+        return self._capped_observation(tool, f"{tool.name} => tool_exception: {msg}")
+
+    def _capped_observation(self, tool: ToolSpec, obs: str) -> str:
+        if len(obs) > _OBSERVATION_HARD_MAX_CHARS:
+            self._trace_observation_capped(tool.name, f"output {len(obs)} chars")
+            obs = truncate(obs, _OBSERVATION_HARD_MAX_CHARS)
+        return obs
+
+    def _trace_observation_capped(self, tool_name: str, what: str) -> None:
+        self._observations_capped += 1
+        if self._config.trace:
+            print(
+                f"  Observation capped: {tool_name} {what} > {_OBSERVATION_HARD_MAX_CHARS} "
+                f"({self._observations_capped} capped so far)"
+            )
+
+    def _observation_update(self, state: _State, obs: str) -> Dict[str, Any]:
+        update, dropped = self._observation_delta(state, obs)
+        if dropped:
+            update["rolling_summary"] = self._summarize_observations(
+                user_query=state["user_query"], previous_summary=state.get("rolling_summary", ""), dropped=dropped
+            )
+        return update
 
+    async def _aobservation_update(self, state: _State, obs: str) -> Dict[str, Any]:
+        update, dropped = self._observation_delta(state, obs)
+        if dropped:
+            update["rolling_summary"] = await self._asummarize_observations(
+                user_query=state["user_query"], previous_summary=state.get("rolling_summary", ""), dropped=dropped
+            )
+        return update
+
+    def _observation_delta(self, state: _State, obs: str) -> Tuple[Dict[str, Any], List[str]]:
+        # (state update, observations that just left the state summary and still need summarizing)
+        update: Dict[str, Any] = {"observations": [obs]}
+        if not self._config.summarize_dropped_observations:
+            return update, []
+        observations = state["observations"] + [obs]
+        start = observation_window_start(observations, self._config.max_observation_chars)
+        summarized = state.get("summarized", 0)
+        if start <= summarized:
+            return update, []
+        update["summarized"] = start
+        return update, observations[summarized:start]
+
+    def _summarize_observations(self, *, user_query: str, previous_summary: str, dropped: Sequence[str]) -> str:
+        system, user = build_observation_summary_prompt(
+            user_query=user_query, previous_summary=previous_summary, dropped_observations=dropped
+        )
+        try:
+            summary = invoke_chat_text(self._models.judge, system=system, user=user)
         except Exception as e:
-            msg = f"{type(e).__name__}: {e}"
-            # Truncate exception messages for trace only
-            if self._config.tool_result_max_chars > 0:
-                 msg_trace = truncate(msg, self._config.tool_result_max_chars)
-            else:
-                 msg_trace = msg
+            return self._observation_summary_failed(previous_summary, e)
+        return self._accept_observation_summary(summary, len(dropped))
 
-            if self._config.trace:
-                print(f"  Tool exception: {tool.name} => {msg_trace}")
-            
-            # Truncate exception for agent observation only if explicitly enabled
-            if self._config.truncate_agent_observations and self._config.tool_result_max_chars > 0:
-                obs = f"{tool.name} => tool_exception: {msg_trace}"
-            else:
-                obs = f"{tool.name} => tool_exception: {msg}"
+    async def _asummarize_observations(
+        self, *, user_query: str, previous_summary: str, dropped: Sequence[str]
+    ) -> str:
+        system, user = build_observation_summary_prompt(
+            user_query=user_query, previous_summary=previous_summary, dropped_observations=dropped
+        )
+        try:
+            summary = await ainvoke_chat_text(self._models.judge, system=system, user=user)
+        except Exception as e:
+            return self._observation_summary_failed(previous_summary, e)
+        return self._accept_observation_summary(summary, len(dropped))
+
+    def _observation_summary_failed(self, previous_summary: str, e: Exception) -> str:
+        # Keep the previous summary; the dropped observations are simply forgotten.
+        if self._config.trace:
+            print(f"  Observation summary failed: {type(e).__name__}: {e}")
+        return previous_summary
 
-        return {**state, "observations": state["observations"] + [obs]}
+    def _accept_observation_summary(self, summary: str, dropped: int) -> str:
+        if self._config.trace:
+            print(f"  Folded {dropped} older observation(s) into the rolling summary")
+        return truncate(summary.strip(), 600)
 
     # ---------------------------------------------------------------------
     # Helpers
@@ -414,7 +1658,9 @@ class LangGraphReActUSCAgent:
         for i, raw in enumerate(raw_candidates):
             cand, errors = validate_reasoner_decision_dict(raw)
             if not cand:
-                invalid.append(f"[{i}] invalid decision: {errors}; raw={safe_json_dumps(raw)}")
+                # The raw dump only feeds the trace (trace_candidates shows 260 chars per entry).
+                raw_preview = f"; raw={preview_json(raw, 260)}" if self._config.trace else ""
+                invalid.append(f"[{i}] invalid decision: {errors}{raw_preview}")
                 continue
 
             if cand.decision_type == "TOOL_CALL":
@@ -424,7 +1670,7 @@ class LangGraphReActUSCAgent:
                     invalid.append(f"[{i}] unknown tool '{tool_name}'")
                     continue
                 args = cand.tool_args or {}
-                arg_errors = validate_json_obj(args, tool.input_schema)
+                arg_errors = self._tools.validate_args(tool.name, args)
                 if arg_errors:
                     invalid.append(f"[{i}] invalid tool args: {arg_errors}")
                     continue
@@ -433,9 +1679,12 @@ class LangGraphReActUSCAgent:
 
         return valid, invalid
 
-    def _best_effort_final(self, *, user_query: str, observations: Sequence[str]) -> JudgeDecision:
+    def _best_effort_final_prompt(self, *, user_query: str, observations: Sequence[str]) -> Tuple[str, str]:
         state_summary = build_state_summary(
-            observations=observations, step_index=self._config.max_steps, max_steps=self._config.max_steps
+            observations=observations,
+            step_index=self._config.max_steps,
+            max_steps=self._config.max_steps,
+            max_observation_chars=self._config.max_observation_chars,
         )
         system = (
             "You are the JUDGE model for a Universal Self-Consistency (USC) agent.\n"
@@ -453,16 +1702,125 @@ class LangGraphReActUSCAgent:
                 "Return a FINAL answer as JSON with keys: decision_type, final_answer, justification.",
             ]
         )
+        return system, user
+
+    def _best_effort_final(self, *, user_query: str, observations: Sequence[str]) -> JudgeDecision:
+        system, user = self._best_effort_final_prompt(user_query=user_query, observations=observations)
+        cache_key = self._judge_cache_key(system, user)
+        judge = self._judge_cache_get(cache_key)
+        if judge is not None:
+            return judge
         try:
-            raw = json_loads_object(invoke_chat_text(self._models.judge, system=system, user=user))
+            raw = json_loads_object(self._judge_text(system, user))
             judge, _ = validate_judge_decision_dict(raw)
         except Exception:
             judge = None
-        return judge or JudgeDecision(
-            decision_type="FINAL",
-            selected_index=None,
-            tool_name=None,
-            tool_args=None,
-            final_answer="Step limit exceeded; no valid final answer could be produced.",
-            justification="failed to parse judge output",
-        )
+        if judge is None:
+            return _step_limit_decision()
+        self._judge_cache_put(cache_key, judge)
+        return judge
+
+    async def _abest_effort_final(self, *, user_query: str, observations: Sequence[str]) -> JudgeDecision:
+        system, user = self._best_effort_final_prompt(user_query=user_query, observations=observations)
+        cache_key = self._judge_cache_key(system, user)
+        judge = self._judge_cache_get(cache_key)
+        if judge is not None:
+            return judge
+        try:
+            raw = json_loads_object(await self._ajudge_text(system, user))
+            judge, _ = validate_judge_decision_dict(raw)
+        except Exception:
+            judge = None
+        if judge is None:
+            return _step_limit_decision()
+        self._judge_cache_put(cache_key, judge)
+        return judge
+
+
+def _candidate_key(c: ReasonerDecision) -> Tuple[Any, ...]:
+    # Rationale/expected_signal are ignored: candidates that only differ in wording are the same decision.
+    # FINAL answers are compared with whitespace collapsed (line breaks, double spaces, trailing newline).
+    answer = " ".join(c.final_answer.split())[:256] if c.final_answer else ""
+    return (c.decision_type, c.tool_name, safe_json_dumps(c.tool_args or {}), answer)
+
+
+def _is_placeholder(c: ReasonerDecision) -> bool:
+    # A failed/timed-out reasoner path (see `_PLACEHOLDER_ANSWERS`), not a decision a model made.
+    return c.decision_type == "FINAL" and c.final_answer in _PLACEHOLDER_ANSWERS
+
+
+def _dedupe(candidates: Sequence[ReasonerDecision]) -> Tuple[List[ReasonerDecision], List[int]]:
+    positions: Dict[Tuple[Any, ...], int] = {}
+    unique: List[ReasonerDecision] = []
+    votes: List[int] = []
+    for c in candidates:
+        key = _candidate_key(c)
+        pos = positions.get(key)
+        if pos is None:
+            positions[key] = len(unique)
+            unique.append(c)
+            votes.append(1)
+        else:
+            votes[pos] += 1
+    return unique, votes
+
+
+def _call_tool_func(func: Callable[[Dict[str, Any]], Any], args: Dict[str, Any]) -> Any:
+    result = func(args)
+    if inspect.iscoroutine(result):
+        # Async tool outside the event loop (sync `run`, or a worker thread): run it to completion here.
+        import asyncio
+
+        result = asyncio.run(result)
+    return result
+
+
+async def _acall_tool_func(func: Callable[[Dict[str, Any]], Any], args: Dict[str, Any]) -> Any:
+    # Coroutine tools are awaited on the loop; sync tools run in a worker thread so they cannot block it.
+    import asyncio
+
+    if inspect.iscoroutinefunction(func):
+        return await func(args)
+    return await asyncio.to_thread(_call_tool_func, func, args)
+
+
+# Answers of the placeholder candidates the agent fills in for reasoner paths that failed or timed out.
+# They are valid FINAL decisions (so the judge sees why paths are missing) but never a real answer.
+_REASONER_FAILED_ANSWER = "Reasoner failed to produce a valid JSON decision."
+_REASONER_TIMED_OUT_ANSWER = "Reasoner timed out before producing a decision."
+_PLACEHOLDER_ANSWERS = frozenset({_REASONER_FAILED_ANSWER, _REASONER_TIMED_OUT_ANSWER})
+
+
+def _failed_reasoner_decision(e: BaseException) -> Dict[str, Any]:
+    return {
+        "decision_type": "FINAL",
+        "tool_name": None,
+        "tool_args": None,
+        "final_answer": _REASONER_FAILED_ANSWER,
+        "brief_rationale": f"Reasoner call failed: {type(e).__name__}: {e}",
+        "expected_signal": None,
+    }
+
+
+def _failed_judge_decision(e: BaseException) -> JudgeDecision:
+    return JudgeDecision(
+        decision_type="FINAL",
+        selected_index=None,
+        tool_name=None,
+        tool_args=None,
+        final_answer="Judge failed to produce a valid JSON decision; stopping.",
+        justification=f"Judge call failed: {type(e).__name__}: {e}",
+        failed=True,
+    )
+
+
+def _step_limit_decision() -> JudgeDecision:
+    return JudgeDecision(
+        decision_type="FINAL",
+        selected_index=None,
+        tool_name=None,
+        tool_args=None,
+        final_answer="Step limit exceeded; no valid final answer could be produced.",
+        justification="failed to parse judge output",
+        failed=True,
+    )
@@ -9,10 +9,30 @@ This uses Google's default credential flow (ADC). To use gcloud:
 Then LangChain's ChatVertexAI can pick up credentials without API keys.
 """
 
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
 
 
-def make_chat_vertex_ai(*, model: str, location: Optional[str] = None, project: Optional[str] = None) -> Any:
+def make_chat_vertex_ai(
+    *,
+    model: str,
+    location: Optional[str] = None,
+    project: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    transport: Optional[str] = "grpc",
+    client: Any = None,
+) -> Any:
+    """
+    Connection reuse: each ChatVertexAI lazily builds one PredictionServiceClient and keeps it for
+    every call, and with the gRPC transport all concurrent calls (the K reasoners) are multiplexed
+    over that client's HTTP/2 channel. Pass `client` (e.g. `reasoner_lc.prediction_client`) to make
+    a second model in the same location share that channel instead of opening its own.
+    Async calls use LangChain's per-event-loop client cache and are shared already.
+
+    `timeout` is sent as the per-request deadline, so the server side abandons a call that outlives
+    it; this is what actually stops a timed-out sync reasoner (a worker thread cannot be cancelled).
+    """
     try:
         from langchain_google_vertexai import ChatVertexAI  # type: ignore
     except Exception as e:  # pragma: no cover
@@ -25,6 +45,189 @@ def make_chat_vertex_ai(*, model: str, location: Optional[str] = None, project:
         kwargs["location"] = location
     if project:
         kwargs["project"] = project
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    # Output tokens dominate latency; None keeps the provider/model default (no explicit cap).
+    if max_tokens is not None:
+        kwargs["max_output_tokens"] = max_tokens
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if transport:
+        kwargs["api_transport"] = transport
+    if client is not None:
+        kwargs["client"] = client
     return ChatVertexAI(**kwargs)
 
 
+def make_vertex_ai_embeddings(*, model: str, location: Optional[str] = None, project: Optional[str] = None) -> Any:
+    try:
+        from langchain_google_vertexai import VertexAIEmbeddings  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "Missing langchain-google-vertexai. Install with: `python -m pip install -r requirements.txt`"
+        ) from e
+
+    kwargs = {"model_name": model}
+    if location:
+        kwargs["location"] = location
+    if project:
+        kwargs["project"] = project
+    return VertexAIEmbeddings(**kwargs)
+
+
+def make_raw_vertex(
+    *,
+    model: str,
+    location: Optional[str] = None,
+    project: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    client: Any = None,
+) -> "RawVertexChat":
+    """
+    Fast-path alternative to `make_chat_vertex_ai`: calls Gemini on Vertex through the google-genai SDK
+    directly, skipping LangChain's per-call callbacks, run tracing and message/response conversion.
+    Pass `client` (e.g. `reasoner.client`) to share one SDK client (connection pool) between models.
+    """
+    if client is None:
+        try:
+            from google import genai  # type: ignore
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError(
+                "Missing google-genai (installed with langchain-google-vertexai). "
+                "Install with: `python -m pip install -r requirements.txt`"
+            ) from e
+        client = genai.Client(vertexai=True, project=project, location=location)
+    return RawVertexChat(client=client, model=model, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+
+
+class RawVertexChat:
+    """
+    Minimal chat model over a google-genai client, implementing the part of the LangChain chat-model
+    interface that `llm_io` uses: invoke/ainvoke, stream/astream, batch/abatch (returning plain strings)
+    and `with_structured_output(schema)` (returning dicts). The schema is sent as `response_json_schema`,
+    so Gemini enforces the JSON shape server-side (controlled generation) whatever `method` is requested.
+    `n>1` sampling (`generate`) is not implemented: "multi_candidate" sampling falls back to per-path calls.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: Any,
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self._options: Dict[str, Any] = {}
+        if temperature is not None:
+            self._options["temperature"] = temperature
+        if max_tokens is not None:
+            self._options["max_output_tokens"] = max_tokens
+        if timeout is not None:
+            # Per-request deadline in milliseconds (same role as ChatVertexAI's `timeout`).
+            self._options["http_options"] = {"timeout": int(timeout * 1000)}
+
+    def _request(self, messages: Sequence[Any], schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        system = [m.content for m in messages if getattr(m, "type", None) == "system"]
+        user = [m.content for m in messages if getattr(m, "type", None) != "system"]
+        config = dict(self._options)
+        if system:
+            config["system_instruction"] = "\n\n".join(system)
+        if schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_json_schema"] = schema
+        return {"model": self.model, "contents": "\n\n".join(user), "config": config}
+
+    def invoke(self, messages: Sequence[Any], config: Any = None) -> str:
+        return self.client.models.generate_content(**self._request(messages)).text or ""
+
+    async def ainvoke(self, messages: Sequence[Any], config: Any = None) -> str:
+        return (await self.client.aio.models.generate_content(**self._request(messages))).text or ""
+
+    def stream(self, messages: Sequence[Any], config: Any = None) -> Iterator[str]:
+        for chunk in self.client.models.generate_content_stream(**self._request(messages)):
+            yield chunk.text or ""
+
+    async def astream(self, messages: Sequence[Any], config: Any = None) -> AsyncIterator[str]:
+        async for chunk in await self.client.aio.models.generate_content_stream(**self._request(messages)):
+            yield chunk.text or ""
+
+    def batch(self, inputs: Sequence[Any], config: Any = None, *, return_exceptions: bool = False) -> List[Any]:
+        return _batch(self.invoke, inputs, config, return_exceptions)
+
+    async def abatch(self, inputs: Sequence[Any], config: Any = None, *, return_exceptions: bool = False) -> List[Any]:
+        return await _abatch(self.ainvoke, inputs, config, return_exceptions)
+
+    def with_structured_output(self, schema: Dict[str, Any], method: Optional[str] = None) -> "_RawVertexStructured":
+        return _RawVertexStructured(self, schema)
+
+
+class _RawVertexStructured:
+    """`RawVertexChat.with_structured_output(schema)`: responses parsed into dicts."""
+
+    def __init__(self, chat: RawVertexChat, schema: Dict[str, Any]) -> None:
+        self._chat = chat
+        self._schema = schema
+
+    def invoke(self, messages: Sequence[Any], config: Any = None) -> Dict[str, Any]:
+        response = self._chat.client.models.generate_content(**self._chat._request(messages, self._schema))
+        return _response_object(response)
+
+    async def ainvoke(self, messages: Sequence[Any], config: Any = None) -> Dict[str, Any]:
+        response = await self._chat.client.aio.models.generate_content(**self._chat._request(messages, self._schema))
+        return _response_object(response)
+
+    def batch(self, inputs: Sequence[Any], config: Any = None, *, return_exceptions: bool = False) -> List[Any]:
+        return _batch(self.invoke, inputs, config, return_exceptions)
+
+    async def abatch(self, inputs: Sequence[Any], config: Any = None, *, return_exceptions: bool = False) -> List[Any]:
+        return await _abatch(self.ainvoke, inputs, config, return_exceptions)
+
+
+def _response_object(response: Any) -> Dict[str, Any]:
+    from .utils import json_loads
+
+    obj = json_loads(response.text or "")
+    if not isinstance(obj, dict):
+        raise ValueError(f"Structured output is not a JSON object: {type(obj).__name__}")
+    return obj
+
+
+def _max_concurrency(config: Any, n: int) -> int:
+    limit = (config or {}).get("max_concurrency") or n
+    return max(1, min(limit, n))
+
+
+def _batch(invoke: Callable[[Any], Any], inputs: Sequence[Any], config: Any, return_exceptions: bool) -> List[Any]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    def call(messages: Any) -> Any:
+        try:
+            return invoke(messages)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    if not inputs:
+        return []
+    with ThreadPoolExecutor(max_workers=_max_concurrency(config, len(inputs))) as pool:
+        return list(pool.map(call, inputs))
+
+
+async def _abatch(
+    ainvoke: Callable[[Any], Awaitable[Any]], inputs: Sequence[Any], config: Any, return_exceptions: bool
+) -> List[Any]:
+    import asyncio
+
+    slots = asyncio.Semaphore(_max_concurrency(config, len(inputs) or 1))
+
+    async def call(messages: Any) -> Any:
+        async with slots:
+            return await ainvoke(messages)
+
+    return list(await asyncio.gather(*(call(m) for m in inputs), return_exceptions=return_exceptions))
@@ -1,36 +1,59 @@
 from __future__ import annotations
 
-from typing import Any, Dict, cast
+import functools
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
 
+from .utils import json_loads
 
-def invoke_chat_text(model: Any, *, system: str, user: str) -> str:
-    """
-    Invoke a LangChain chat model using proper message objects so "system" content is
-    actually treated as system instructions.
-    """
+
+def _chat_messages(*, system: str, user: str) -> List[Any]:
     # Lazy import to avoid importing langchain at module import time.
-    from langchain_core.messages import HumanMessage, SystemMessage  # type: ignore
+    from langchain_core.messages import HumanMessage  # type: ignore
+
+    return [_system_message(system), HumanMessage(content=user)]
+
+
+@functools.lru_cache(maxsize=64)
+def _system_message(system: str) -> Any:
+    # The system prompt repeats across the K paths and every step: build its (pydantic) message once.
+    # Models only read input messages, so one instance can be shared by concurrent calls.
+    from langchain_core.messages import SystemMessage  # type: ignore
+
+    return SystemMessage(content=system)
+
 
-    out = model.invoke([SystemMessage(content=system), HumanMessage(content=user)])
+def _text_content(out: Any) -> str:
     content = getattr(out, "content", None)
     return content if isinstance(content, str) else cast(str, out)
 
 
-def invoke_chat_structured_obj(model: Any, *, system: str, user: str, schema: Any) -> Dict[str, Any]:
-    """
-    Best-effort wrapper around LangChain structured output.
+# (id(model), id(schema), method) -> (model, schema, bound runnable). Holding model and schema keeps their
+# ids from being reused; schemas are treated as immutable once bound.
+_STRUCTURED_RUNNABLES: Dict[Tuple[int, int, Optional[str]], Tuple[Any, Any, Any]] = {}
+_STRUCTURED_RUNNABLES_MAX = 64
 
-    Returns a plain dict, or raises to allow the caller to fall back to the legacy JSON parsing path.
-    """
-    # Lazy import to avoid importing langchain at module import time.
-    from langchain_core.messages import HumanMessage, SystemMessage  # type: ignore
 
+def _structured_runnable(model: Any, schema: Any, method: Optional[str] = None) -> Any:
+    # Binding converts the schema into a provider tool/response schema: done once per (model, schema, method).
+    key = (id(model), id(schema), method)
+    hit = _STRUCTURED_RUNNABLES.get(key)
+    if hit is not None and hit[0] is model and hit[1] is schema:
+        return hit[2]
     if not hasattr(model, "with_structured_output"):
         raise TypeError("Model does not support with_structured_output")
+    # Only pass `method` when it differs from the default: not every chat model accepts the kwarg.
+    if method and method != "function_calling":
+        runnable = model.with_structured_output(schema, method=method)  # type: ignore[attr-defined]
+    else:
+        runnable = model.with_structured_output(schema)  # type: ignore[attr-defined]
+    if len(_STRUCTURED_RUNNABLES) >= _STRUCTURED_RUNNABLES_MAX:
+        _STRUCTURED_RUNNABLES.clear()
+    _STRUCTURED_RUNNABLES[key] = (model, schema, runnable)
+    return runnable
 
-    runnable = model.with_structured_output(schema)  # type: ignore[attr-defined]
-    out = runnable.invoke([SystemMessage(content=system), HumanMessage(content=user)])
 
+def _structured_to_dict(out: Any) -> Dict[str, Any]:
     if isinstance(out, dict):
         return cast(Dict[str, Any], out)
     # Pydantic v2
@@ -43,9 +66,197 @@ def invoke_chat_structured_obj(model: Any, *, system: str, user: str, schema: An
     raise TypeError(f"Unsupported structured output type: {type(out).__name__}")
 
 
-def json_loads_object(text: str) -> Dict[str, Any]:
-    import json
+def invoke_chat_text(model: Any, *, system: str, user: str) -> str:
+    """
+    Invoke a LangChain chat model using proper message objects so "system" content is
+    actually treated as system instructions.
+    """
+    return _text_content(model.invoke(_chat_messages(system=system, user=user)))
+
+
+async def ainvoke_chat_text(model: Any, *, system: str, user: str) -> str:
+    """
+    Async variant of `invoke_chat_text` (uses the model's native `ainvoke`).
+    """
+    return _text_content(await model.ainvoke(_chat_messages(system=system, user=user)))
+
+
+class _JsonObjectEnd:
+    """Incremental scanner: `feed` returns True once the first top-level JSON object has closed."""
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._depth > 0
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    return True
+        return False
+
+
+def stream_chat_json_text(model: Any, *, system: str, user: str) -> str:
+    """
+    Like `invoke_chat_text`, but streams the response and stops reading once the first JSON object is
+    complete, so text the model adds after it (closing fences, commentary) is not waited for.
+    """
+    scanner = _JsonObjectEnd()
+    parts: List[str] = []
+    stream = model.stream(_chat_messages(system=system, user=user))
+    try:
+        for chunk in stream:
+            text = _text_content(chunk)
+            parts.append(text)
+            if scanner.feed(text):
+                break
+    finally:
+        stream.close()  # ends the underlying streaming request
+    return "".join(parts)
+
+
+async def astream_chat_json_text(model: Any, *, system: str, user: str) -> str:
+    """
+    Async variant of `stream_chat_json_text` (uses the model's native `astream`).
+    """
+    scanner = _JsonObjectEnd()
+    parts: List[str] = []
+    stream = model.astream(_chat_messages(system=system, user=user))
+    try:
+        async for chunk in stream:
+            text = _text_content(chunk)
+            parts.append(text)
+            if scanner.feed(text):
+                break
+    finally:
+        await stream.aclose()
+    return "".join(parts)
+
+
+def generate_chat_texts(model: Any, *, system: str, user: str, n: int) -> List[str]:
+    """
+    Sample `n` candidates for one prompt in a single request (`n` maps to Vertex `candidate_count`).
+
+    Backends that ignore `n` return fewer texts; callers must handle a short list.
+    """
+    result = model.generate([_chat_messages(system=system, user=user)], n=n)
+    return [_text_content(g.message) for g in result.generations[0]]
+
 
+async def agenerate_chat_texts(model: Any, *, system: str, user: str, n: int) -> List[str]:
+    """
+    Async variant of `generate_chat_texts`.
+    """
+    result = await model.agenerate([_chat_messages(system=system, user=user)], n=n)
+    return [_text_content(g.message) for g in result.generations[0]]
+
+
+def invoke_chat_structured_obj(
+    model: Any, *, system: str, user: str, schema: Any, method: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Best-effort wrapper around LangChain structured output.
+
+    `method` is forwarded to `with_structured_output` (e.g. "json_mode" for Vertex controlled generation).
+    Returns a plain dict, or raises to allow the caller to fall back to the legacy JSON parsing path.
+    """
+    runnable = _structured_runnable(model, schema, method)
+    return _structured_to_dict(runnable.invoke(_chat_messages(system=system, user=user)))
+
+
+async def ainvoke_chat_structured_obj(
+    model: Any, *, system: str, user: str, schema: Any, method: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of `invoke_chat_structured_obj`.
+    """
+    runnable = _structured_runnable(model, schema, method)
+    return _structured_to_dict(await runnable.ainvoke(_chat_messages(system=system, user=user)))
+
+
+def _batch_inputs(prompts: Sequence[Tuple[str, str]], max_concurrency: Optional[int]) -> Tuple[List[Any], Dict[str, Any]]:
+    return [_chat_messages(system=system, user=user) for system, user in prompts], {"max_concurrency": max_concurrency}
+
+
+def batch_invoke_chat_text(
+    model: Any, prompts: Sequence[Tuple[str, str]], *, max_concurrency: Optional[int] = None
+) -> List[Union[str, Exception]]:
+    """
+    Invoke several `(system, user)` prompts with one `Runnable.batch` call (provider batching where
+    the model implements it). Results keep prompt order; a failed prompt yields its exception.
+    """
+    inputs, config = _batch_inputs(prompts, max_concurrency)
+    outs = model.batch(inputs, config=config, return_exceptions=True)
+    return [o if isinstance(o, Exception) else _text_content(o) for o in outs]
+
+
+async def abatch_invoke_chat_text(
+    model: Any, prompts: Sequence[Tuple[str, str]], *, max_concurrency: Optional[int] = None
+) -> List[Union[str, Exception]]:
+    """
+    Async variant of `batch_invoke_chat_text` (`Runnable.abatch`).
+    """
+    inputs, config = _batch_inputs(prompts, max_concurrency)
+    outs = await model.abatch(inputs, config=config, return_exceptions=True)
+    return [o if isinstance(o, Exception) else _text_content(o) for o in outs]
+
+
+def batch_invoke_chat_structured(
+    model: Any,
+    prompts: Sequence[Tuple[str, str]],
+    *,
+    schema: Any,
+    method: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Structured-output variant of `batch_invoke_chat_text`. Raises if the model has no structured output.
+    """
+    runnable = _structured_runnable(model, schema, method)
+    inputs, config = _batch_inputs(prompts, max_concurrency)
+    outs = runnable.batch(inputs, config=config, return_exceptions=True)
+    return [o if isinstance(o, Exception) else _structured_to_dict(o) for o in outs]
+
+
+async def abatch_invoke_chat_structured(
+    model: Any,
+    prompts: Sequence[Tuple[str, str]],
+    *,
+    schema: Any,
+    method: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Async variant of `batch_invoke_chat_structured`.
+    """
+    runnable = _structured_runnable(model, schema, method)
+    inputs, config = _batch_inputs(prompts, max_concurrency)
+    outs = await runnable.abatch(inputs, config=config, return_exceptions=True)
+    return [o if isinstance(o, Exception) else _structured_to_dict(o) for o in outs]
+
+
+# Markdown-fenced output: "```json\n{...}\n```" (the first line may carry any language tag).
+_FENCE_RE = re.compile(r"\A```[^\n]*\n(.*)\n[ \t]*```\Z", re.S)
+# First "{" through last "}": the JSON object inside surrounding prose.
+_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+# First "[" through last "]": the JSON array inside surrounding prose.
+_ARRAY_RE = re.compile(r"\[.*\]", re.S)
+
+
+def json_loads_object(text: str) -> Dict[str, Any]:
     cleaned = text.strip()
     if not cleaned:
         raise ValueError("Empty model output (expected JSON object).")
@@ -54,24 +265,50 @@ def json_loads_object(text: str) -> Dict[str, Any]:
     #   ```json
     #   {...}
     #   ```
-    if cleaned.startswith("```"):
-        lines = cleaned.splitlines()
-        if len(lines) >= 3 and lines[0].startswith("```") and lines[-1].strip() == "```":
-            cleaned = "\n".join(lines[1:-1]).strip()
-            # If the first line is a language tag (e.g. "json"), drop it.
-            if cleaned.lower().startswith("json"):
-                cleaned = cleaned[4:].lstrip()
+    fenced = _FENCE_RE.match(cleaned)
+    if fenced:
+        cleaned = fenced.group(1).strip()
+        # If the language tag ended up on its own line (e.g. "json"), drop it.
+        if cleaned[:4].lower() == "json":
+            cleaned = cleaned[4:].lstrip()
 
     # If the model included extra text, extract the first JSON object substring.
     if not cleaned.startswith("{"):
-        start = cleaned.find("{")
-        end = cleaned.rfind("}")
-        if start >= 0 and end > start:
-            cleaned = cleaned[start : end + 1].strip()
+        found = _OBJECT_RE.search(cleaned)
+        if found:
+            cleaned = found.group(0)
 
-    data = json.loads(cleaned)
+    data = json_loads(cleaned)
     if not isinstance(data, dict):
         raise ValueError(f"Expected JSON object, got {type(data).__name__}")
     return data
 
 
+def json_loads_array(text: str) -> List[Any]:
+    """
+    Like `json_loads_object`, for a JSON array (markdown fences and surrounding prose are stripped).
+    A single top-level object is returned as a one-element list.
+    """
+    cleaned = text.strip()
+    if not cleaned:
+        raise ValueError("Empty model output (expected JSON array).")
+
+    fenced = _FENCE_RE.match(cleaned)
+    if fenced:
+        cleaned = fenced.group(1).strip()
+        if cleaned[:4].lower() == "json":
+            cleaned = cleaned[4:].lstrip()
+
+    if cleaned.startswith("{"):
+        return [json_loads_object(cleaned)]
+    if not cleaned.startswith("["):
+        found = _ARRAY_RE.search(cleaned)
+        if found:
+            cleaned = found.group(0)
+        else:
+            return [json_loads_object(cleaned)]
+
+    data = json_loads(cleaned)
+    if not isinstance(data, list):
+        raise ValueError(f"Expected JSON array, got {type(data).__name__}")
+    return data
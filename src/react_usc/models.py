@@ -8,9 +8,11 @@ JSONValue = Union[None, bool, int, float, str, List["JSONValue"], Dict[str, "JSO
 
 DecisionType = Literal["TOOL_CALL", "FINAL"]
 SelectionStrategy = Literal["select_one", "synthesize_one"]
+ReasonerSampling = Literal["per_path", "multi_candidate", "runnable_batch", "batched_prompt"]
+StructuredOutputMethod = Literal["function_calling", "json_mode"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ToolSpec:
     name: str
     description: str
@@ -18,7 +20,7 @@ class ToolSpec:
     func: Callable[[Dict[str, Any]], Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ModelConfig:
     name: str
     temperature: float
@@ -26,13 +28,13 @@ class ModelConfig:
     max_tokens: Optional[int] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RetryConfig:
     max_retries: int
     backoff_seconds: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentConfig:
     system_prompt: str
     k_paths: int
@@ -45,15 +47,79 @@ class AgentConfig:
     trace: bool
     tool_result_max_chars: int
     # If true, tool outputs are truncated before being fed to the agent (using tool_result_max_chars).
-    # If false, the agent always sees the full output, and truncation only applies to terminal logs.
+    # If false, truncation with tool_result_max_chars only applies to terminal logs; the agent still never
+    # sees more than 64 KiB of a single observation (`_OBSERVATION_HARD_MAX_CHARS` in lc_agent.py).
     truncate_agent_observations: bool = False
     timeout_seconds: float = 20.0
     # If true, use LangChain structured output (`with_structured_output`) when possible.
     # The agent will fall back to text JSON parsing if the backend doesn't support it.
     use_structured_output: bool = True
-
-
-@dataclass(frozen=True)
+    # How structured output is requested:
+    #   - "function_calling": LangChain's default (the schema is bound as a forced tool call).
+    #   - "json_mode": Vertex controlled generation (`response_mime_type="application/json"` +
+    #     `response_schema`), so the server enforces the decision schema on the generated JSON.
+    structured_output_method: StructuredOutputMethod = "function_calling"
+    # If true, text-JSON judge calls (structured output off or failed, and the step-limit final) are
+    # streamed and reading stops once the JSON object closes, instead of waiting for any trailing text.
+    stream_judge: bool = False
+    # Plan cache: reuse the reasoner candidates of a previously seen step state
+    # (same system prompt, query, tools and state summary) instead of re-sampling K reasoners.
+    # 0 disables the cache; otherwise it is the max number of cached step states (LRU).
+    plan_cache_size: int = 0
+    # Judge cache: reuse the judge decision for a byte-identical judge prompt (same query, state
+    # summary and candidates), also for the step-limit best-effort final. 0 disables (LRU size otherwise).
+    judge_cache_size: int = 0
+    # Collapse identical reasoner candidates (same decision, tool, args and final answer, ignoring
+    # whitespace) into one entry with a vote count before the judge sees them. If every valid candidate is
+    # the same decision and it has at least ceil(k_paths/2) votes, the judge call is skipped and it is used:
+    # with this default, agreeing paths bypass the judge entirely (not under selection_strategy
+    # "synthesize_one", where the judge always runs).
+    dedupe_candidates: bool = True
+    # Majority-vote shortcut (needs dedupe_candidates): skip the judge when one decision holds at least
+    # ceil(k_paths/2) votes even if other candidates disagree. FINAL answers that are near-identical
+    # (similarity ratio >= vote_shortcut_similarity) count as the same vote.
+    enable_vote_shortcut: bool = False
+    vote_shortcut_similarity: float = 0.9
+    # How the K reasoner candidates are sampled:
+    #   - "per_path": K separate requests (one per PATH_ID), run concurrently.
+    #   - "multi_candidate": one request with `n=k_paths` (Vertex `candidate_count`), so the prompt is
+    #     sent and prefilled once. Falls back to per-path requests if the backend rejects `n>1`.
+    #   - "runnable_batch": the K per-path prompts go through one LangChain `Runnable.batch`/`abatch`
+    #     call (provider batching where the model implements it); timeout applies to the whole batch.
+    #   - "batched_prompt": one request asks for a JSON array with one decision per PATH_ID, so the shared
+    #     context is sent once; paths the answer is missing (or fails to parse) get per-path requests.
+    reasoner_sampling: ReasonerSampling = "per_path"
+    # If false, PATH_ID is left out of the reasoner prompt, so the K prompts of a step are identical and
+    # "per_path" sampling sends one `n=k_paths` request (as "multi_candidate") instead of K copies of it.
+    # At reasoner temperature 0 a single request is made and its decision counts for all K paths.
+    reasoner_path_ids: bool = True
+    # Max per-path reasoner requests in flight at once across all runs of this agent (sync runs share one
+    # bound, async runs one per event loop), e.g. to stay under a Vertex quota with run_batch or the A2A
+    # server. Time spent waiting for a slot counts toward timeout_seconds. 0 = unbounded.
+    max_concurrent_reasoner_calls: int = 0
+    # Speculative judge ("per_path" sampling only): once ceil(k_paths/2) reasoners have returned valid
+    # candidates, start the judge on them while the slower reasoners finish. Its decision is kept if
+    # the late candidates only add votes to decisions it already saw; otherwise the judge runs again.
+    speculative_judge: bool = False
+    # Adaptive K: when the largest group of identical candidates holds >= adaptive_k_agreement of a step's
+    # paths, the next step samples only max(adaptive_k_min, 3) paths; otherwise it goes back to k_paths.
+    # 0 disables (always k_paths).
+    adaptive_k_min: int = 0
+    adaptive_k_agreement: float = 0.8
+    # Observation budget: the state summary shows at most the last 10 observations, trimmed further
+    # (oldest first) to fit max_observation_chars. 0 = no character budget.
+    max_observation_chars: int = 0
+    # If true, observations that fall out of the state summary are folded into a short rolling summary
+    # by the judge model (one extra call whenever observations are dropped) instead of being forgotten.
+    summarize_dropped_observations: bool = False
+    # Judge prompt budget: candidate final_answer/rationale/expected_signal and top-level string tool args
+    # longer than this are truncated in the judge prompt. If the judge selects a truncated candidate as-is,
+    # the agent restores the full answer/args. 0 = candidates are shown in full.
+    judge_candidate_char_budget: int = 0
+
+
+# Created K times per step: slots keep these small (no per-instance __dict__).
+@dataclass(frozen=True, slots=True)
 class ReasonerDecision:
     decision_type: DecisionType
     tool_name: Optional[str]
@@ -63,7 +129,7 @@ class ReasonerDecision:
     expected_signal: Optional[str] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class JudgeDecision:
     decision_type: DecisionType
     selected_index: Optional[int]
@@ -71,5 +137,8 @@ class JudgeDecision:
     tool_args: Optional[Dict[str, Any]]
     final_answer: Optional[str]
     justification: str
+    # Set on the agent's own fallback decisions (judge call/parse failure, invalid judge output, step limit
+    # without a final answer), never by the model: a run ending on one has no real answer.
+    failed: bool = False
 
 
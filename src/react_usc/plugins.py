@@ -1,22 +1,89 @@
 from __future__ import annotations
 
+import copy
+import inspect
+import re
+import threading
 import time
-from typing import Any, Callable, Dict, List, Optional, Sequence
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from .llm_io import invoke_chat_structured_obj, invoke_chat_text, json_loads_object
+from .llm_io import (
+    ainvoke_chat_structured_obj,
+    ainvoke_chat_text,
+    invoke_chat_structured_obj,
+    invoke_chat_text,
+    json_loads_object,
+)
 from .models import ToolSpec
 from .prompts import build_reflection_prompt
 from .schema import REFLECTION_DECISION_SCHEMA
 from .utils import safe_json_dumps
-from .validation import validate_json_obj
+from .validation import JsonValidator, validate_json_obj
+
+
+# Error text that usually means "try the same call again": timeouts, dropped connections, throttling, 5xx.
+_TRANSIENT_RE = re.compile(
+    r"time[d ]?out|connection|rate.?limit|too many requests|unavailable|temporar|\b5\d\d\b", re.I
+)
+
+
+def _looks_transient(e: BaseException) -> bool:
+    return isinstance(e, (TimeoutError, ConnectionError)) or bool(_TRANSIENT_RE.search(str(e)))
+
+
+# Per-occurrence noise in error text (UUIDs/request ids, hex addresses, ports, timestamps, counters),
+# masked so the same failure maps to the same reflection cache key.
+_ERROR_NOISE_RE = re.compile(r"[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}|0x[0-9a-f]+|\d{4,}", re.I)
+
+
+def _error_fingerprint(error: str) -> str:
+    return _ERROR_NOISE_RE.sub("#", error)
 
 
 class ReflectAndRetryToolPlugin:
-    def __init__(self, model: Any, max_retries: int = 3, backoff_seconds: float = 1.0, trace: bool = False):
+    def __init__(
+        self,
+        model: Any,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        trace: bool = False,
+        speculative_retry: bool = False,
+        wait_on_transient: bool = False,
+        reflection_cache_size: int = 0,
+    ):
+        """
+        `speculative_retry`: on a transient-looking error, re-run the tool with the same args while the
+        reflection call is in flight. A WAIT verdict then uses that attempt instead of sleeping first; any
+        other verdict discards it. Only enable it for idempotent tools (a discarded attempt may still run).
+        `wait_on_transient`: on a transient-looking error (timeout, connection, rate limit, 5xx), take the
+        WAIT verdict directly and skip the reflection call (takes precedence over `speculative_retry`).
+        `reflection_cache_size`: reuse the reflection decision for a repeated (query, tool, args, error)
+        failure instead of calling the model again; 0 disables, otherwise the max number of decisions kept.
+        """
         self.model = model
+        # Probed once: models without structured output go straight to the text JSON path.
+        self._supports_structured = hasattr(model, "with_structured_output")
         self.max_retries = max_retries
         self.backoff_seconds = backoff_seconds
         self.trace = trace
+        self.speculative_retry = speculative_retry
+        self.wait_on_transient = wait_on_transient
+        self.reflection_cache_size = reflection_cache_size
+        # (query, tool, sorted args JSON, error fingerprint) -> reflection decision (LRU)
+        self._reflection_cache: "OrderedDict[Tuple[str, str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._reflection_cache_lock = threading.Lock()
+        self._executor: Any = None
+        self._executor_lock = threading.Lock()
+
+    def _speculation_executor(self) -> Any:
+        # Created on the first speculative retry; sync `run` only (run_async uses tasks).
+        with self._executor_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="react-usc-retry")
+            return self._executor
 
     def run(
         self,
@@ -27,17 +94,29 @@ class ReflectAndRetryToolPlugin:
         all_tools: Sequence[ToolSpec],
         user_query: str,
         tool_input_schema: Dict[str, Any],
+        executor: Any = None,
+        tool_validator: Optional[JsonValidator] = None,
     ) -> Any:
         """
         Execute tool with retry loop and reflection logic.
+        `executor` (optional) runs speculative retries, e.g. the calling agent's worker pool;
+        without it the plugin starts its own pool on first use.
+        `tool_validator` (optional) is the tool's precompiled arg validator (e.g. `ToolRegistry.validator`);
+        without it RETRY args are checked with `validate_json_obj(args, tool_input_schema)`.
         """
         current_args = tool_args
+        speculative: Any = None
         
         for attempt in range(self.max_retries + 1):
             try:
                 if self.trace and attempt > 0:
                     print(f"    [Retry {attempt}] Executing {tool_name} with args={safe_json_dumps(current_args)}")
                 
+                if speculative is not None:
+                    # This attempt already started alongside the reflection call: take its outcome.
+                    future, speculative = speculative, None
+                    return future.result()
+
                 # Try execution
                 return tool_func(current_args)
             
@@ -48,55 +127,189 @@ class ReflectAndRetryToolPlugin:
                         print(f"    [Retry] Exhausted {self.max_retries} retries. Raising exception: {e}")
                     raise e
                 
-                # Reflection Step
-                if self.trace:
-                    print(f"    [Retry] Error caught: {e}. Reflecting...")
+                decision = self._transient_wait(e)
+                if decision is None:
+                    # Reflection Step
+                    if self.trace:
+                        print(f"    [Retry] Error caught: {e}. Reflecting...")
 
-                decision = self._reflect(
-                    user_query=user_query,
+                    if self.speculative_retry and _looks_transient(e):
+                        speculative = (executor or self._speculation_executor()).submit(tool_func, current_args)
+
+                    decision = self._reflect(
+                        user_query=user_query,
+                        tool_name=tool_name,
+                        tool_args=current_args,
+                        error=str(e),
+                        tools=all_tools,
+                    )
+                
+                action, value = self._apply_verdict(
+                    decision,
+                    attempt=attempt,
                     tool_name=tool_name,
-                    tool_args=current_args,
-                    error=str(e),
-                    tools=all_tools,
+                    tool_input_schema=tool_input_schema,
+                    tool_validator=tool_validator,
+                    error=e,
                 )
-                
-                verdict = decision.get("verdict")
+                if action == "wait":
+                    # The speculative attempt (if any) already waited out the reflection call.
+                    if speculative is None:
+                        time.sleep(value)
+                    # continue loop with same current_args
+                    continue
+                if speculative is not None:
+                    # Not retrying the same args: drop the speculative attempt (cancelled if still queued).
+                    speculative.cancel()
+                    speculative = None
+                if action == "abort":
+                    return value
+                if action == "retry":
+                    current_args = value
+                    continue
+                # If we get here (unknown verdict or other issue), just raise
+                raise e
+
+    async def run_async(
+        self,
+        *,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        tool_func: Callable[[Dict[str, Any]], Any],
+        all_tools: Sequence[ToolSpec],
+        user_query: str,
+        tool_input_schema: Dict[str, Any],
+        tool_validator: Optional[JsonValidator] = None,
+    ) -> Any:
+        """
+        Async variant of `run`: awaits `tool_func` when it returns an awaitable, reflects with the model's
+        native `ainvoke`, and backs off with `asyncio.sleep`, so a WAIT verdict never blocks the event loop.
+        """
+        import asyncio
+
+        current_args = tool_args
+        speculative: Optional[asyncio.Task[Any]] = None
 
-                if verdict == "ABORT":
-                    suggestion = decision.get("abort_suggestion", "Tool execution aborted by reflection.")
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.trace and attempt > 0:
+                    print(f"    [Retry {attempt}] Executing {tool_name} with args={safe_json_dumps(current_args)}")
+
+                if speculative is not None:
+                    task, speculative = speculative, None
+                    return await task
+                return await _call_tool(tool_func, current_args)
+
+            except Exception as e:
+                if attempt == self.max_retries:
                     if self.trace:
-                         print(f"    [Retry] ABORT verdict. Suggestion: {suggestion}")
-                    # Return a special string observation that the agent will see
-                    return f"Reflection Error: The tool '{tool_name}' failed and reflection decided to abort. Suggestion: {suggestion}"
+                        print(f"    [Retry] Exhausted {self.max_retries} retries. Raising exception: {e}")
+                    raise e
 
-                if verdict == "WAIT":
-                    # Exponential backoff: backoff * 2^(attempt)
-                    wait_time = self.backoff_seconds * (2 ** attempt)
+                decision = self._transient_wait(e)
+                if decision is None:
                     if self.trace:
-                         print(f"    [Retry] WAIT verdict. Sleeping {wait_time:.2f}s before retrying same args...")
-                    time.sleep(wait_time)
-                    # continue loop with same current_args
-                    continue
+                        print(f"    [Retry] Error caught: {e}. Reflecting...")
 
-                if verdict == "RETRY":
-                    new_args = decision.get("retry_args")
-                    # Validate the new args against schema
-                    arg_errors = validate_json_obj(new_args or {}, tool_input_schema)
-                    if arg_errors:
-                         if self.trace:
-                            print(f"    [Retry] Reflection produced invalid args: {arg_errors}")
-                         # If reflection failed to produce valid args, we might as well stop or try again?
-                         # For now, let's treat it as a failed retry attempt and let the loop continue (or fail next execution)
-                         pass 
-                    else:
-                        current_args = new_args
-                        if self.trace:
-                             print(f"    [Retry] Retrying with new args: {safe_json_dumps(current_args)}")
-                        continue
-                
-                # If we get here (unknown verdict or other issue), just raise
+                    if self.speculative_retry and _looks_transient(e):
+                        speculative = asyncio.ensure_future(_call_tool(tool_func, current_args))
+
+                    decision = await self._areflect(
+                        user_query=user_query,
+                        tool_name=tool_name,
+                        tool_args=current_args,
+                        error=str(e),
+                        tools=all_tools,
+                    )
+                action, value = self._apply_verdict(
+                    decision,
+                    attempt=attempt,
+                    tool_name=tool_name,
+                    tool_input_schema=tool_input_schema,
+                    tool_validator=tool_validator,
+                    error=e,
+                )
+                if action == "wait":
+                    if speculative is None:
+                        await asyncio.sleep(value)
+                    continue
+                if speculative is not None:
+                    _discard_task(speculative)
+                    speculative = None
+                if action == "abort":
+                    return value
+                if action == "retry":
+                    current_args = value
+                    continue
                 raise e
 
+    def _transient_wait(self, e: Exception) -> Optional[Dict[str, Any]]:
+        # With `wait_on_transient`, obviously transient errors get WAIT without a reflection round-trip.
+        if not (self.wait_on_transient and _looks_transient(e)):
+            return None
+        if self.trace:
+            print(f"    [Retry] Transient error: {e}. WAIT without reflection.")
+        return {"verdict": "WAIT"}
+
+    def _apply_verdict(
+        self,
+        decision: Dict[str, Any],
+        *,
+        attempt: int,
+        tool_name: str,
+        tool_input_schema: Dict[str, Any],
+        tool_validator: Optional[JsonValidator] = None,
+        error: Optional[BaseException] = None,
+    ) -> Tuple[str, Any]:
+        """
+        Turn a reflection decision into the retry loop's next action, shared by `run` and `run_async`:
+        ("abort", observation), ("wait", seconds), ("retry", new_args), or ("raise", None).
+        """
+        verdict = str(decision.get("verdict") or "").strip().upper()
+        if verdict not in ("RETRY", "WAIT", "ABORT"):
+            # Unknown/missing verdict: abort with an observation instead of re-raising the tool error,
+            # so the agent still learns why the call failed.
+            if self.trace:
+                print(f"    [Retry] Unknown reflection verdict {decision.get('verdict')!r}; treating as ABORT.")
+            verdict = "ABORT"
+            decision = {
+                "abort_suggestion": (
+                    f"Unknown verdict {decision.get('verdict')!r} returned by reflection; defaulting to abort. "
+                    f"Original error: {error}"
+                ),
+            }
+
+        if verdict == "ABORT":
+            suggestion = decision.get("abort_suggestion", "Tool execution aborted by reflection.")
+            if self.trace:
+                print(f"    [Retry] ABORT verdict. Suggestion: {suggestion}")
+            # Return a special string observation that the agent will see
+            return "abort", f"Reflection Error: The tool '{tool_name}' failed and reflection decided to abort. Suggestion: {suggestion}"
+
+        if verdict == "WAIT":
+            # Exponential backoff: backoff * 2^(attempt)
+            wait_time = self.backoff_seconds * (2 ** attempt)
+            if self.trace:
+                print(f"    [Retry] WAIT verdict. Sleeping {wait_time:.2f}s before retrying same args...")
+            return "wait", wait_time
+
+        if verdict == "RETRY":
+            new_args = decision.get("retry_args")
+            # Validate the new args against schema
+            if tool_validator is not None:
+                arg_errors = tool_validator(new_args or {})
+            else:
+                arg_errors = validate_json_obj(new_args or {}, tool_input_schema)
+            if not arg_errors:
+                if self.trace:
+                    print(f"    [Retry] Retrying with new args: {safe_json_dumps(new_args)}")
+                return "retry", new_args
+            if self.trace:
+                print(f"    [Retry] Reflection produced invalid args: {arg_errors}")
+            # If reflection failed to produce valid args, treat it as a failed retry attempt.
+
+        return "raise", None
+
     def _reflect(
         self,
         *,
@@ -106,6 +319,11 @@ class ReflectAndRetryToolPlugin:
         error: str,
         tools: Sequence[ToolSpec],
     ) -> Dict[str, Any]:
+        key = self._reflection_key(user_query, tool_name, tool_args, error)
+        cached = self._reflection_cache_get(key)
+        if cached is not None:
+            return cached
+
         system, user = build_reflection_prompt(
             user_query=user_query,
             tool_name=tool_name,
@@ -115,25 +333,117 @@ class ReflectAndRetryToolPlugin:
         )
 
         try:
-            # Try structured output first
-            # We assume the model supports it if passed in (similar to agent logic)
-            # But here we might not know if the model supports it. 
-            # Ideally we check config, but plugin is standalone.
-            # We'll try structured, fallback to text.
-            try:
-                return invoke_chat_structured_obj(
-                    self.model,
-                    system=system,
-                    user=user,
-                    schema=REFLECTION_DECISION_SCHEMA,
-                )
-            except Exception:
-                 # Fallback
-                 text = invoke_chat_text(self.model, system=system, user=user)
-                 return json_loads_object(text)
+            # Try structured output first (when the model has it), fall back to text JSON.
+            decision: Optional[Dict[str, Any]] = None
+            if self._supports_structured:
+                try:
+                    decision = invoke_chat_structured_obj(
+                        self.model,
+                        system=system,
+                        user=user,
+                        schema=REFLECTION_DECISION_SCHEMA,
+                    )
+                except Exception:
+                    decision = None
+            if decision is None:
+                text = invoke_chat_text(self.model, system=system, user=user)
+                decision = json_loads_object(text)
         except Exception as e:
             if self.trace:
                 print(f"    [Retry] Reflection model call failed: {e}")
             # If reflection fails, return ABORT so we don't infinite loop blindly
             return {"verdict": "ABORT", "abort_suggestion": f"Reflection mechanism failed: {e}"}
+        self._reflection_cache_put(key, decision)
+        return decision
+
+    async def _areflect(
+        self,
+        *,
+        user_query: str,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        error: str,
+        tools: Sequence[ToolSpec],
+    ) -> Dict[str, Any]:
+        # Async variant of `_reflect` (same prompt, fallbacks and ABORT-on-failure).
+        key = self._reflection_key(user_query, tool_name, tool_args, error)
+        cached = self._reflection_cache_get(key)
+        if cached is not None:
+            return cached
+
+        system, user = build_reflection_prompt(
+            user_query=user_query,
+            tool_name=tool_name,
+            tool_args=tool_args,
+            error=error,
+            tools=tools,
+        )
+
+        try:
+            decision: Optional[Dict[str, Any]] = None
+            if self._supports_structured:
+                try:
+                    decision = await ainvoke_chat_structured_obj(
+                        self.model,
+                        system=system,
+                        user=user,
+                        schema=REFLECTION_DECISION_SCHEMA,
+                    )
+                except Exception:
+                    decision = None
+            if decision is None:
+                text = await ainvoke_chat_text(self.model, system=system, user=user)
+                decision = json_loads_object(text)
+        except Exception as e:
+            if self.trace:
+                print(f"    [Retry] Reflection model call failed: {e}")
+            return {"verdict": "ABORT", "abort_suggestion": f"Reflection mechanism failed: {e}"}
+        self._reflection_cache_put(key, decision)
+        return decision
+
+    # --- Reflection cache (see `reflection_cache_size`) ---
+
+    def _reflection_key(
+        self, user_query: str, tool_name: str, tool_args: Dict[str, Any], error: str
+    ) -> Optional[Tuple[str, str, str, str]]:
+        if self.reflection_cache_size <= 0:
+            return None
+        return user_query, tool_name, safe_json_dumps(tool_args), _error_fingerprint(error)
+
+    def _reflection_cache_get(self, key: Optional[Tuple[str, str, str, str]]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        with self._reflection_cache_lock:
+            cached = self._reflection_cache.get(key)
+            if cached is None:
+                return None
+            self._reflection_cache.move_to_end(key)
+        if self.trace:
+            print(f"    [Retry] Reusing cached reflection verdict: {cached.get('verdict')}")
+        # Copy: retry_args are handed to the tool, which must not be able to alter the cached decision.
+        return copy.deepcopy(cached)
+
+    def _reflection_cache_put(self, key: Optional[Tuple[str, str, str, str]], decision: Dict[str, Any]) -> None:
+        # Only decisions the model actually produced are cached; mechanism failures are retried next time.
+        if key is None:
+            return
+        with self._reflection_cache_lock:
+            self._reflection_cache[key] = copy.deepcopy(decision)
+            while len(self._reflection_cache) > self.reflection_cache_size:
+                self._reflection_cache.popitem(last=False)
+
+
+async def _call_tool(tool_func: Callable[[Dict[str, Any]], Any], args: Dict[str, Any]) -> Any:
+    # Tool functions passed to `run_async` may return a value or an awaitable.
+    result = tool_func(args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
 
+def _discard_task(task: Any) -> None:
+    if task.done():
+        if not task.cancelled():
+            task.exception()  # mark a failure as retrieved so asyncio does not log it
+    else:
+        task.cancel()
@@ -1,23 +1,52 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from .models import AgentConfig, ReasonerDecision, ToolSpec
+from .utils import prompt_json_dumps, truncate
+
+# id(input_schema) -> (input_schema, its JSON). Holding the schema keeps its id from being reused;
+# input schemas are treated as immutable once a ToolSpec is built.
+_SCHEMA_JSON: Dict[int, Tuple[Dict[str, Any], str]] = {}
+_SCHEMA_JSON_MAX = 256
+
+
+def _schema_json(schema: Dict[str, Any]) -> str:
+    hit = _SCHEMA_JSON.get(id(schema))
+    if hit is not None and hit[0] is schema:
+        return hit[1]
+    text = prompt_json_dumps(schema)
+    if len(_SCHEMA_JSON) >= _SCHEMA_JSON_MAX:
+        _SCHEMA_JSON.clear()
+    _SCHEMA_JSON[id(schema)] = (schema, text)
+    return text
+
+
+# tuple of tool ids -> (the ToolSpecs, their rendered block); same identity check as `_SCHEMA_JSON`.
+_TOOLS_BLOCK: Dict[Tuple[int, ...], Tuple[Tuple[ToolSpec, ...], str]] = {}
+_TOOLS_BLOCK_MAX = 64
+
 
 def build_tools_block(tools: Sequence[ToolSpec]) -> str:
-    parts = []
+    # Rendered once per tool set: the reflection prompt rebuilds it on every failed tool call.
+    key = tuple(id(t) for t in tools)
+    hit = _TOOLS_BLOCK.get(key)
+    if hit is not None and all(a is b for a, b in zip(hit[0], tools)):
+        return hit[1]
+    # Each tool's schema is serialized once per process (see `_schema_json`), not once per prompt.
+    # One flat list of lines and a single join (no per-tool intermediate strings).
+    lines: List[str] = []
     for t in tools:
-        parts.append(
-            "\n".join(
-                [
-                    f"- name: {t.name}",
-                    f"  description: {t.description}",
-                    f"  input_schema: {json.dumps(t.input_schema, ensure_ascii=False)}",
-                ]
-            )
-        )
-    return "\n".join(parts)
+        lines += [
+            f"- name: {t.name}",
+            f"  description: {t.description}",
+            f"  input_schema: {_schema_json(t.input_schema)}",
+        ]
+    text = "\n".join(lines)
+    if len(_TOOLS_BLOCK) >= _TOOLS_BLOCK_MAX:
+        _TOOLS_BLOCK.clear()
+    _TOOLS_BLOCK[key] = (tuple(tools), text)
+    return text
 
 def _tool_name_list(tools: Sequence[ToolSpec]) -> str:
     return ", ".join([t.name for t in tools])
@@ -49,52 +78,102 @@ def reasoner_decision_to_json(d: ReasonerDecision) -> Dict[str, Any]:
     }
 
 
+def judge_candidate_json(d: ReasonerDecision, char_budget: int = 0) -> Dict[str, Any]:
+    """
+    `reasoner_decision_to_json` as shown to the judge: with `char_budget > 0`, the text fields and the
+    top-level string values of tool_args are cut to `char_budget` chars (see `utils.truncate`).
+    """
+    obj = reasoner_decision_to_json(d)
+    if char_budget <= 0:
+        return obj
+    for field in ("final_answer", "brief_rationale", "expected_signal"):
+        if obj[field]:
+            obj[field] = truncate(obj[field], char_budget)
+    if d.tool_args:
+        obj["tool_args"] = {
+            k: truncate(v, char_budget) if isinstance(v, str) else v for k, v in d.tool_args.items()
+        }
+    return obj
+
+
 def build_reasoner_prompt(
     *,
     system_prompt: str,
     user_query: str,
     state_summary: str,
     tools: Sequence[ToolSpec],
-    path_id: int,
+    path_id: Optional[int],
 ) -> Tuple[str, str]:
-    system = (
-        "You are a REASONER model inside a ReAct-style agent.\n"
-        "Follow the agent system instructions, then decide the single best next action.\n"
-        "Return ONLY a JSON object matching the ReasonerDecision schema.\n"
-        "Never include extra keys.\n"
+    return (
+        build_reasoner_system(system_prompt=system_prompt, tools=tools),
+        build_reasoner_user(user_query=user_query, state_summary=state_summary, path_id=path_id),
     )
-    user = "\n".join(
+
+
+def build_reasoner_system(*, system_prompt: str, tools: Sequence[ToolSpec], batched: bool = False) -> str:
+    # Everything that is fixed for a given agent (instructions, tools, format, examples) lives in the
+    # system message so every call shares a byte-identical prefix that the provider can cache.
+    # Per-step data (query, observations, path) only appears in the user message.
+    # Depends only on the agent's tools and system prompt: callers build it once per agent, not per step or path.
+    # batched=True asks for a JSON array with one decision per PATH_ID (see `build_reasoner_batch_tail`).
+    if batched:
+        output_lines = [
+            "Return ONLY a JSON array with one ReasonerDecision object per PATH_ID listed in the user message, in PATH_ID order.",
+            "Each PATH_ID is an independent reasoning path: decide it on its own, not as a variation of the others.",
+            "Each object must match ReasonerDecision with either:",
+        ]
+    else:
+        output_lines = ["Return ONLY a JSON object that matches ReasonerDecision with either:"]
+    return "\n".join(
         [
+            "You are a REASONER model inside a ReAct-style agent.",
+            "Follow the agent system instructions, then decide the single best next action.",
+            "Return ONLY a JSON array of ReasonerDecision objects." if batched else "Return ONLY a JSON object matching the ReasonerDecision schema.",
+            "Never include extra keys.",
+            "",
             "REASONER INSTRUCTIONS:",
             system_prompt.strip(),
             "",
-            f"PATH_ID: {path_id}",
-            "",
-            "ORIGINAL_USER_QUERY:",
-            user_query.strip(),
-            "",
-            "CURRENT_STATE_SUMMARY:",
-            state_summary,
-            "",
             "AVAILABLE_TOOLS:",
             build_tools_block(tools),
             "",
             "OUTPUT_FORMAT:",
-            "Return ONLY a JSON object that matches ReasonerDecision with either:",
+            *output_lines,
             '- decision_type="TOOL_CALL" and tool_name/tool_args set, final_answer null; OR',
             '- decision_type="FINAL" and final_answer set, tool_name/tool_args null.',
             f"tool_name MUST be one of: {_tool_name_list(tools)}",
             "If decision_type is TOOL_CALL, tool_args MUST include ALL required keys from that tool's input_schema. Do not return empty {}.",
             "Do NOT wrap the JSON in markdown fences (no ```json).",
-            "brief_rationale is REQUIRED: write 1-2 short sentences explaining why this is the best next step.",
+            "brief_rationale is REQUIRED: one short sentence (max 120 characters) explaining why this is the best next step.",
             "Do NOT use placeholders like 'N/A'.",
             "",
             _tool_examples_block(tools),
-            "",
-            "JSON_ONLY:",
         ]
     )
-    return system, user
+
+
+def build_reasoner_user(*, user_query: str, state_summary: str, path_id: Optional[int]) -> str:
+    prefix = build_reasoner_user_prefix(user_query=user_query, state_summary=state_summary)
+    return prefix + build_reasoner_user_tail(path_id)
+
+
+def build_reasoner_user_prefix(*, user_query: str, state_summary: str) -> str:
+    # PATH_ID is the only part that differs between the K paths of a step, so it goes last:
+    # system + query + state summary form a prefix shared by all K requests (implicit prompt caching).
+    # Callers build the prefix once per step and append `build_reasoner_user_tail(path_id)` per path.
+    return f"ORIGINAL_USER_QUERY:\n{user_query.strip()}\n\nCURRENT_STATE_SUMMARY:\n{state_summary}\n\n"
+
+
+def build_reasoner_user_tail(path_id: Optional[int]) -> str:
+    # path_id=None leaves PATH_ID out, making the prompt path-independent.
+    if path_id is None:
+        return "JSON_ONLY:"
+    return f"PATH_ID: {path_id}\n\nJSON_ONLY:"
+
+
+def build_reasoner_batch_tail(num_paths: int) -> str:
+    # Replaces the per-path tail when one request produces the candidates of all `num_paths` paths.
+    return f"PATH_IDS: {', '.join(str(i) for i in range(num_paths))}\n\nJSON_ARRAY_ONLY ({num_paths} objects):"
 
 
 def build_judge_prompt(
@@ -104,31 +183,33 @@ def build_judge_prompt(
     candidates: Sequence[ReasonerDecision],
     tools: Sequence[ToolSpec],
     config: AgentConfig,
+    votes: Optional[Sequence[int]] = None,
 ) -> Tuple[str, str]:
-    system = (
-        "You are the JUDGE model for a Universal Self-Consistency (USC) agent.\n"
-        "You must pick the single best next decision from multiple candidates, or synthesize one.\n"
-        "Return ONLY a JSON object matching the JudgeDecision schema.\n"
+    # Static rules/tools first (cacheable prefix), per-step query/state/candidates last.
+    return (
+        build_judge_system(tools=tools, config=config),
+        build_judge_user(
+            user_query=user_query,
+            state_summary=state_summary,
+            candidates=candidates,
+            votes=votes,
+            char_budget=config.judge_candidate_char_budget,
+        ),
     )
 
-    candidates_json = [reasoner_decision_to_json(c) for c in candidates]
-    user = "\n".join(
+
+def build_judge_system(*, tools: Sequence[ToolSpec], config: AgentConfig) -> str:
+    # Depends only on the agent's tools and config: callers build it once per agent, not once per step.
+    return "\n".join(
         [
-            "JUDGE INSTRUCTIONS:",
-            "",
-            # Required: MUST include original user query in judge prompt context.
-            "ORIGINAL_USER_QUERY:",
-            user_query.strip(),
-            "",
-            "CURRENT_STATE_SUMMARY:",
-            state_summary,
+            "You are the JUDGE model for a Universal Self-Consistency (USC) agent.",
+            "You must pick the single best next decision from multiple candidates, or synthesize one.",
+            "Return ONLY a JSON object matching the JudgeDecision schema.",
             "",
+            "JUDGE INSTRUCTIONS:",
             f"SELECTION_STRATEGY: {config.selection_strategy}",
             f"ALLOW_TOOL_SYNTHESIS: {str(config.allow_tool_synthesis).lower()}",
             "",
-            "CANDIDATES:",
-            json.dumps(candidates_json, ensure_ascii=False),
-            "",
             "AVAILABLE_TOOLS:",
             build_tools_block(tools),
             "",
@@ -138,6 +219,7 @@ def build_judge_prompt(
             "- tool appropriateness/minimality",
             "- safety/policy compliance (basic)",
             "- expected value for reducing uncertainty",
+            "- agreement across reasoner paths (CANDIDATE_VOTES, when given, counts identical proposals)",
             "",
             "DECISION_RULES:",
             '- If selection_strategy="select_one": set selected_index to the chosen candidate index and copy its decision.',
@@ -150,58 +232,107 @@ def build_judge_prompt(
             "Return ONLY a JSON object matching JudgeDecision.",
             "Do NOT wrap the JSON in markdown fences (no ```json).",
             "Do NOT nest the decision under a 'decision' key. Do NOT include extra keys like 'comment'.",
-            "justification is REQUIRED: write 1-2 short sentences explaining why this is the best single next step.",
+            "justification is REQUIRED: one short sentence (max 120 characters) explaining why this is the best single next step.",
             "Do NOT use placeholders like 'N/A'.",
             "",
             _tool_examples_block(tools),
-            "",
-            "JSON_ONLY:",
         ]
     )
-    return system, user
 
-def build_reflection_prompt(
+
+def build_judge_user(
     *,
     user_query: str,
-    tool_name: str,
-    tool_args: Dict[str, Any],
-    error: str,
-    tools: Sequence[ToolSpec],
+    state_summary: str,
+    candidates: Sequence[ReasonerDecision],
+    votes: Optional[Sequence[int]] = None,
+    char_budget: int = 0,
+) -> str:
+    # `votes[i]` is how many reasoner paths proposed candidates[i] (after deduplication).
+    # `char_budget` caps long candidate fields (see `judge_candidate_json`); 0 shows them in full.
+    candidates_json = [judge_candidate_json(c, char_budget) for c in candidates]
+    votes_block = "" if votes is None else f"CANDIDATE_VOTES:\n{prompt_json_dumps(list(votes))}\n\n"
+    # Required: MUST include original user query in judge prompt context.
+    return (
+        f"ORIGINAL_USER_QUERY:\n{user_query.strip()}\n\n"
+        f"CURRENT_STATE_SUMMARY:\n{state_summary}\n\n"
+        f"CANDIDATES:\n{prompt_json_dumps(candidates_json)}\n\n"
+        f"{votes_block}JSON_ONLY:"
+    )
+
+def build_observation_summary_prompt(
+    *,
+    user_query: str,
+    previous_summary: str,
+    dropped_observations: Sequence[str],
 ) -> Tuple[str, str]:
     system = (
-        "You are a Tool Usage Expert debugging a failed tool call.\n"
-        "Analyze the error and decide whether to RETRY with corrected args, WAIT for transient errors, or ABORT if the tool is inappropriate.\n"
-        "Return ONLY a JSON object matching the ReflectionDecision schema.\n"
+        "You compress the older tool observations of a ReAct-style agent into a rolling summary.\n"
+        "Keep every fact, number and error that may matter for answering the user query; drop the rest.\n"
+        "Return ONLY the summary as plain text, at most 3 short sentences.\n"
     )
-
     user = "\n".join(
         [
-            "REFLECTION INSTRUCTIONS:",
-            "A tool execution failed. Your goal is to fix it if possible, or advise the agent to stop if the tool is wrong.",
-            "",
-            "ORIGINAL USER QUERY:",
+            "ORIGINAL_USER_QUERY:",
             user_query.strip(),
             "",
-            "FAILED TOOL CALL:",
-            f"Tool: {tool_name}",
-            f"Args: {json.dumps(tool_args, ensure_ascii=False)}",
-            f"Error: {error}",
+            "PREVIOUS_SUMMARY:",
+            previous_summary or "(none)",
             "",
-            "AVAILABLE TOOLS:",
-            build_tools_block(tools),
-            "",
-            "DECISION RULES:",
-            "1. RETRY: If the error is a syntax error, invalid argument format, or hallucinated argument, and the tool IS appropriate for the query -> Generate corrected 'retry_args'.",
-            "2. WAIT: If the error looks transient (e.g. network timeout, rate limit, server error 5xx, connection reset) and arguments look correct -> Select WAIT to pause and retry with the SAME arguments.",
-            "3. ABORT: If the tool itself is not capable of handling the query (e.g. using calculator for search), or if you cannot fix it -> Provide an 'abort_suggestion' explaining why and what tool might be better.",
-            "",
-            "OUTPUT_FORMAT:",
-            "Return ONLY a JSON object matching ReflectionDecision.",
-            "Do NOT wrap the JSON in markdown fences (no ```json).",
-            "If verdict is RETRY, 'retry_args' must be valid JSON matching the tool's schema.",
-            "If verdict is WAIT or ABORT, 'retry_args' should be null/omitted.",
+            "OBSERVATIONS_TO_FOLD_IN (oldest first):",
+            "\n".join([f"- {o}" for o in dropped_observations]),
             "",
-            "JSON_ONLY:",
+            "SUMMARY:",
         ]
     )
     return system, user
+
+
+# Static parts of the reflection prompt, joined once at import; each call fills in a single f-string.
+_REFLECTION_SYSTEM = (
+    "You are a Tool Usage Expert debugging a failed tool call.\n"
+    "Analyze the error and decide whether to RETRY with corrected args, WAIT for transient errors, or ABORT if the tool is inappropriate.\n"
+    "Return ONLY a JSON object matching the ReflectionDecision schema.\n"
+)
+_REFLECTION_HEAD = "\n".join(
+    [
+        "REFLECTION INSTRUCTIONS:",
+        "A tool execution failed. Your goal is to fix it if possible, or advise the agent to stop if the tool is wrong.",
+        "",
+        "ORIGINAL USER QUERY:",
+        "",
+    ]
+)
+_REFLECTION_TAIL = "\n".join(
+    [
+        "DECISION RULES:",
+        "1. RETRY: If the error is a syntax error, invalid argument format, or hallucinated argument, and the tool IS appropriate for the query -> Generate corrected 'retry_args'.",
+        "2. WAIT: If the error looks transient (e.g. network timeout, rate limit, server error 5xx, connection reset) and arguments look correct -> Select WAIT to pause and retry with the SAME arguments.",
+        "3. ABORT: If the tool itself is not capable of handling the query (e.g. using calculator for search), or if you cannot fix it -> Provide an 'abort_suggestion' explaining why and what tool might be better.",
+        "",
+        "OUTPUT_FORMAT:",
+        "Return ONLY a JSON object matching ReflectionDecision.",
+        "Do NOT wrap the JSON in markdown fences (no ```json).",
+        "If verdict is RETRY, 'retry_args' must be valid JSON matching the tool's schema.",
+        "If verdict is WAIT or ABORT, 'retry_args' should be null/omitted.",
+        "",
+        "JSON_ONLY:",
+    ]
+)
+
+
+def build_reflection_prompt(
+    *,
+    user_query: str,
+    tool_name: str,
+    tool_args: Dict[str, Any],
+    error: str,
+    tools: Sequence[ToolSpec],
+) -> Tuple[str, str]:
+    user = (
+        f"{_REFLECTION_HEAD}{user_query.strip()}\n\n"
+        f"FAILED TOOL CALL:\nTool: {tool_name}\nArgs: {prompt_json_dumps(tool_args)}\nError: {error}\n\n"
+        f"AVAILABLE TOOLS:\n{build_tools_block(tools)}\n\n{_REFLECTION_TAIL}"
+    )
+    return _REFLECTION_SYSTEM, user
+
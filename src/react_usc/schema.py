@@ -52,7 +52,7 @@ def get_reasoner_decision_schema(tool_schemas: Sequence[Dict[str, Any]]) -> Dict
                 "anyOf": _get_tool_args_options(tool_schemas)
             },
             "final_answer": {"type": "string"},
-            "brief_rationale": {"type": "string"},
+            "brief_rationale": {"type": "string", "maxLength": 120},
             "expected_signal": {"type": "string"},
         },
     }
@@ -75,7 +75,7 @@ def get_judge_decision_schema(tool_schemas: Sequence[Dict[str, Any]]) -> Dict[st
                  "anyOf": _get_tool_args_options(tool_schemas)
             },
             "final_answer": {"type": "string"},
-            "justification": {"type": "string"},
+            "justification": {"type": "string", "maxLength": 120},
         },
     }
 
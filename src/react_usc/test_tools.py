@@ -1,5 +1,6 @@
 
 from typing import Any, Dict, cast
+import itertools
 import time
 from .models import ToolSpec
 
@@ -14,10 +15,9 @@ def make_flaky_tool() -> ToolSpec:
     - "GET /health": Succeeds immediately.
     """
     
-    # State to track attempts per command type
-    state = {
-        "sync_attempts": 0
-    }
+    # Attempt counter for the sync endpoint. next() on itertools.count is atomic under the GIL, so concurrent
+    # calls (e.g. speculative retries on a worker thread) each get their own attempt number.
+    sync_attempts = itertools.count(1)
 
     def _http_client_mock(args: Dict[str, Any]) -> Any:
         endpoint = cast(str, args.get("endpoint", "")).strip()
@@ -36,10 +36,10 @@ def make_flaky_tool() -> ToolSpec:
         # Scenario 2: WAIT (Transient 503)
         # "POST /api/v1/sync/data" fails twice with 503, then succeeds
         elif method == "POST" and endpoint == "/api/v1/sync/data":
-            state["sync_attempts"] += 1
-            if state["sync_attempts"] < 3:
+            attempt = next(sync_attempts)
+            if attempt < 3:
                 raise RuntimeError("503 Service Unavailable: Upstream data sync service is overloaded. Retry-After: 1s")
-            return {"status": 201, "message": f"Data synced successfully on attempt {state['sync_attempts']}"}
+            return {"status": 201, "message": f"Data synced successfully on attempt {attempt}"}
 
         # Scenario 3: ABORT (Fatal 403/405)
         # "DELETE /api/v1/admin/system" is strictly forbidden
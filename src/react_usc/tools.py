@@ -1,20 +1,34 @@
 from __future__ import annotations
 
 import ast
+import functools
 import math
-from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, cast
 
 from .models import ToolSpec
-from .utils import simple_word_hits
+from .utils import word_tokens
+from .validation import JsonValidator, compile_json_validator
 
 
 class ToolRegistry:
     def __init__(self, tools: Sequence[ToolSpec]) -> None:
         self._tools: Dict[str, ToolSpec] = {t.name: t for t in tools}
+        # Arg validators compiled once per tool at registration; every candidate/judge/tool call reuses them.
+        self._validators: Dict[str, JsonValidator] = {
+            t.name: compile_json_validator(t.input_schema) for t in self._tools.values()
+        }
 
     def get(self, name: str) -> Optional[ToolSpec]:
         return self._tools.get(name)
 
+    def validator(self, name: str) -> JsonValidator:
+        """The compiled arg validator of a registered tool (e.g. for the reflect-and-retry plugin)."""
+        return self._validators[name]
+
+    def validate_args(self, name: str, args: Any) -> List[str]:
+        """Errors for `args` against the registered tool's input schema ([] if valid)."""
+        return self._validators[name](args)
+
     def all(self) -> List[ToolSpec]:
         return list(self._tools.values())
 
@@ -69,10 +83,13 @@ class SafeCalculator:
 
 def make_calculator_tool() -> ToolSpec:
     calc = SafeCalculator()
+    # Evaluation is pure: repeated expressions (retries, K paths proposing the same call) skip the parse/walk.
+    # Errors are not cached, so a bad expression raises every time.
+    eval_cached = functools.lru_cache(maxsize=256)(calc.eval)
 
     def _calc(args: Dict[str, Any]) -> Any:
         expr = cast(str, args["expression"])
-        value = calc.eval(expr)
+        value = eval_cached(expr)
         if math.isfinite(value) and abs(value - round(value)) < 1e-12:
             return int(round(value))
         return value
@@ -101,17 +118,23 @@ def make_simple_search_tool() -> ToolSpec:
         "tool calling": "Tool calling uses structured function invocation (name + JSON args) instead of parsing freeform text.",
     }
 
+    # The corpus is static: its word sets (for the fallback scoring) are computed once here.
+    key_words: Dict[str, Set[str]] = {k: word_tokens(k) for k in corpus}
+
     def _search(args: Dict[str, Any]) -> Any:
         q = cast(str, args["query"]).lower()
+        q_tokens = q.split()
         hits: List[Dict[str, str]] = []
 
         # Direct substring / token heuristics.
         for k, v in corpus.items():
-            if k in q or any(tok in k for tok in q.split()):
+            if k in q or any(tok in k for tok in q_tokens):
                 hits.append({"key": k, "value": v})
 
         if not hits:
-            scored: List[Tuple[int, str]] = [(simple_word_hits(q, k), k) for k in corpus]
+            # Same scores as `simple_word_hits(q, k)`, with the query tokenized once.
+            q_words = word_tokens(q, 3)
+            scored: List[Tuple[int, str]] = [(len(q_words & key_words[k]), k) for k in corpus]
             scored.sort(reverse=True)
             for _, key in scored[:2]:
                 hits.append({"key": key, "value": corpus[key]})
@@ -3,30 +3,31 @@ from __future__ import annotations
 from typing import Sequence
 
 from .models import JudgeDecision, ReasonerDecision
-from .utils import safe_json_dumps, truncate
+from .utils import preview_json, truncate
 
 
 def trace_candidates(*, step: int, k: int, valid: Sequence[ReasonerDecision], invalid: Sequence[str]) -> None:
-    print(f"\nStep {step}: reasoner candidates (K={k})")
+    # One print per step: fewer stdout writes, and the block stays together when concurrent runs trace.
+    lines = [f"\nStep {step}: reasoner candidates (K={k})"]
     if invalid:
-        print("  Invalid candidates:")
-        for r in invalid[:8]:
-            print(f"   - {truncate(r, 260)}")
+        lines.append("  Invalid candidates:")
+        lines += [f"   - {truncate(r, 260)}" for r in invalid[:8]]
         if len(invalid) > 8:
-            print(f"   - ... ({len(invalid) - 8} more)")
+            lines.append(f"   - ... ({len(invalid) - 8} more)")
     if not valid:
-        print("  Valid candidates: (none)")
-        return
-    print("  Valid candidates:")
-    for i, c in enumerate(valid):
-        if c.decision_type == "TOOL_CALL":
-            print(
-                f"   [{i}] TOOL_CALL tool={c.tool_name} "
-                f"args={truncate(safe_json_dumps(c.tool_args), 140)} "
-                f"| rationale={truncate(c.brief_rationale, 120)}"
-            )
-        else:
-            print(f"   [{i}] FINAL | rationale={truncate(c.brief_rationale, 120)}")
+        lines.append("  Valid candidates: (none)")
+    else:
+        lines.append("  Valid candidates:")
+        for i, c in enumerate(valid):
+            if c.decision_type == "TOOL_CALL":
+                lines.append(
+                    f"   [{i}] TOOL_CALL tool={c.tool_name} "
+                    f"args={preview_json(c.tool_args, 140)} "
+                    f"| rationale={truncate(c.brief_rationale, 120)}"
+                )
+            else:
+                lines.append(f"   [{i}] FINAL | rationale={truncate(c.brief_rationale, 120)}")
+    print("\n".join(lines))
 
 
 def trace_judge(*, step: int, decision: JudgeDecision) -> None:
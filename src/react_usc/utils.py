@@ -1,42 +1,178 @@
 from __future__ import annotations
 
 import json
+import math
 import re
-from typing import Any, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+try:  # Optional accelerator: several times faster than stdlib json for model-output parsing.
+    import orjson as _orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    _orjson = None
 
 
 def truncate(s: str, max_chars: int) -> str:
-    if max_chars <= 0 or len(s) <= max_chars:
+    n = len(s)
+    if max_chars <= 0 or n <= max_chars:
         return s
     # Keep suffix info for debugging.
-    return s[: max(0, max_chars - 24)] + f"... [truncated {len(s)} chars]"
+    return s[: max(0, max_chars - 24)] + f"... [truncated {n} chars]"
+
+
+# Observations shown in the state summary (most recent last).
+_OBSERVATION_WINDOW = 10
 
 
-def build_state_summary(*, observations: Sequence[str], step_index: int, max_steps: int) -> str:
+def observation_window_start(observations: Sequence[str], max_chars: int = 0) -> int:
+    """
+    Index of the oldest observation shown in the state summary: the last 10, trimmed further from
+    the oldest end until they fit in `max_chars` (0 = no character budget). The newest is always kept.
+    """
+    start = max(0, len(observations) - _OBSERVATION_WINDOW)
+    if max_chars > 0:
+        total = sum(len(o) for o in observations[start:])
+        while total > max_chars and start < len(observations) - 1:
+            total -= len(observations[start])
+            start += 1
+    return start
+
+
+def build_state_summary(
+    *,
+    observations: Sequence[str],
+    step_index: int,
+    max_steps: int,
+    max_observation_chars: int = 0,
+    rolling_summary: Optional[str] = None,
+) -> str:
     """
     Format the agent's current loop state as a compact, stable text block.
     Kept separate from prompt construction so it can be reused across prompting strategies.
+    Observations older than the window are dropped, or represented by `rolling_summary` if given.
     """
-    obs_lines = "\n".join([f"- {o}" for o in observations[-10:]]) if observations else "- (none)"
-    return "\n".join(
-        [
-            f"step: {step_index}/{max_steps}",
-            "observations (most recent last):",
-            obs_lines,
-        ]
-    )
+    start = observation_window_start(observations, max_observation_chars)
+    lines = [f"step: {step_index}/{max_steps}", "observations (most recent last):"]
+    if rolling_summary:
+        lines.append(f"- (summary of earlier observations) {rolling_summary}")
+    elif start and max_observation_chars > 0:
+        lines.append(f"- ({start} earlier observations omitted)")
+    lines.extend([f"- {o}" for o in observations[start:]] or ["- (none)"])
+    return "\n".join(lines)
+
+
+# All JSON writers here (`safe_json_dumps`, `prompt_json_dumps`, `bounded_json_dumps`) produce the same text
+# for the same value, with or without orjson: compact separators, and non-finite floats (NaN/Infinity)
+# written as null, as orjson does, so the output stays valid JSON and cache keys don't depend on the path.
+
+
+def _finite(obj: Any) -> Any:
+    # Copy of a JSON-like value with NaN/Infinity replaced by None (stdlib json would write NaN/Infinity).
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_json_dumps(obj: Any, *, sort_keys: bool) -> str:
+    kwargs: Dict[str, Any] = {"ensure_ascii": False, "sort_keys": sort_keys, "separators": (",", ":")}
+    try:
+        return json.dumps(obj, allow_nan=False, **kwargs)
+    except ValueError:
+        # Non-finite floats (or a reference cycle, which still raises below).
+        return json.dumps(_finite(obj), allow_nan=False, **kwargs)
 
 
 def safe_json_dumps(obj: Any) -> str:
+    # Compact, sorted keys (see the note above `_finite`).
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS | _orjson.OPT_SORT_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits or unsupported types: let stdlib json / repr handle it
     try:
-        return json.dumps(obj, ensure_ascii=False, sort_keys=True)
+        return _stdlib_json_dumps(obj, sort_keys=True)
     except Exception:
         return repr(obj)
 
 
+def prompt_json_dumps(obj: Any) -> str:
+    """
+    Compact JSON for prompt text (schemas, candidates, tool args): orjson when installed, else stdlib json
+    with the same separators. Key order is kept as given (unlike `safe_json_dumps`).
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass  # non-str keys, ints beyond 64 bits: stdlib json handles them
+    return _stdlib_json_dumps(obj, sort_keys=False)
+
+
+_BOUNDED_SUFFIX = "... [truncated]"
+
+
+def bounded_json_dumps(obj: Any, max_chars: int) -> Tuple[str, bool]:
+    """
+    Serialize like `safe_json_dumps` (compact, sorted keys) but stop once `max_chars` is exceeded,
+    so a huge tool result costs O(max_chars) instead of O(len(result)).
+    Returns (text, truncated); truncated text ends with "... [truncated]" and fits in `max_chars`.
+    """
+    if max_chars <= 0:
+        return safe_json_dumps(obj), False
+    if isinstance(obj, str):
+        # Escaping never shortens a string, so encoding the first max_chars characters is enough.
+        obj = obj[: max_chars + 1]
+    parts: List[str] = []
+    size = 0
+    try:
+        # allow_nan=False: NaN/Infinity raise and take the `safe_json_dumps` path below, which writes null.
+        encoder = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"), allow_nan=False)
+        for chunk in encoder.iterencode(obj):
+            parts.append(chunk)
+            size += len(chunk)
+            if size > max_chars:
+                break
+    except (TypeError, ValueError):
+        # Not plain JSON (e.g. dataclasses, mixed key types, NaN): fall back to the full serializer.
+        text = safe_json_dumps(obj)
+    else:
+        text = "".join(parts)
+    if len(text) <= max_chars:
+        return text, False
+    return text[: max(0, max_chars - len(_BOUNDED_SUFFIX))] + _BOUNDED_SUFFIX, True
+
+
+def preview_json(obj: Any, max_chars: int) -> str:
+    # Trace-line rendering: serializes at most max_chars instead of dumping a large object and cutting it.
+    return bounded_json_dumps(obj, max_chars)[0]
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON with orjson when installed, else stdlib json.
+    Inputs orjson rejects but stdlib accepts (NaN/Infinity, out-of-range numbers) are retried with
+    stdlib json, which raises a `ValueError` subclass (`json.JSONDecodeError`) if still invalid.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def word_tokens(text: str, min_len: int = 1) -> Set[str]:
+    """Lowercase alphabetic words of `text` with at least `min_len` letters."""
+    return {t for t in _WORD_RE.findall(text.lower()) if len(t) >= min_len}
+
+
 def simple_word_hits(query: str, key: str) -> int:
-    q_tokens = {t for t in re.findall(r"[a-z]+", query.lower()) if len(t) >= 3}
-    k_tokens = set(re.findall(r"[a-z]+", key.lower()))
-    return len(q_tokens & k_tokens)
+    return len(word_tokens(query, 3) & word_tokens(key))
 
 
@@ -1,57 +1,80 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 from .models import DecisionType, JudgeDecision, ReasonerDecision
 
 
-def _type_matches(value: Any, expected_type: str) -> bool:
-    if expected_type == "string":
-        return isinstance(value, str)
-    if expected_type == "number":
-        return isinstance(value, (int, float)) and not isinstance(value, bool)
-    if expected_type == "integer":
-        return isinstance(value, int) and not isinstance(value, bool)
-    if expected_type == "boolean":
-        return isinstance(value, bool)
-    if expected_type == "object":
-        return isinstance(value, dict)
-    if expected_type == "array":
-        return isinstance(value, list)
-    if expected_type == "null":
-        return value is None
-    return True  # Unknown type: accept to keep validator lightweight.
+# JSON schema type -> isinstance check. Unknown types are accepted to keep the validator lightweight.
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+JsonValidator = Callable[[Any], List[str]]
+
+
+def _no_errors(obj: Any) -> List[str]:
+    return []
+
+
+def compile_json_validator(schema: Dict[str, Any]) -> JsonValidator:
+    """
+    Precompute the checks of `validate_json_obj` for one schema (required keys and typed
+    properties are resolved once), and return a callable that validates objects against it.
+    """
+    if schema.get("type") != "object":
+        return _no_errors
+
+    required = tuple(schema.get("required", []))
+    typed_props: List[Tuple[str, str, Callable[[Any], bool]]] = []
+    for key, prop_schema in schema.get("properties", {}).items():
+        expected_type = prop_schema.get("type")
+        if isinstance(expected_type, str) and expected_type in _TYPE_CHECKS:
+            typed_props.append((key, expected_type, _TYPE_CHECKS[expected_type]))
+
+    def validate(obj: Any) -> List[str]:
+        if not isinstance(obj, dict):
+            return [f"Expected object, got {type(obj).__name__}"]
+        errors = [f"Missing required key: {key}" for key in required if key not in obj]
+        for key, expected_type, check in typed_props:
+            if key in obj and not check(obj[key]):
+                errors.append(f"Key '{key}' expected type {expected_type}, got {type(obj[key]).__name__}")
+        return errors
+
+    return validate
+
+
+# id(schema) -> (schema, compiled validator) for `validate_json_obj`. Holding the schema keeps its id
+# from being reused; schemas are treated as immutable once validated against.
+_VALIDATORS: Dict[int, Tuple[Dict[str, Any], JsonValidator]] = {}
+_VALIDATORS_MAX = 256
 
 
 def validate_json_obj(obj: Any, schema: Dict[str, Any]) -> List[str]:
     """
     Lightweight JSON schema validator for objects used in tool args.
+    The compiled validator is cached per schema object, so repeated calls (e.g. reflection retries
+    against a tool's input schema) do not recompile it; see `compile_json_validator`.
 
     Supported subset:
       - type: "object"
       - required: [..]
       - properties: { key: {type: ...} }
     """
-    errors: List[str] = []
-    if schema.get("type") == "object":
-        if not isinstance(obj, dict):
-            return [f"Expected object, got {type(obj).__name__}"]
-
-        required = schema.get("required", [])
-        for key in required:
-            if key not in obj:
-                errors.append(f"Missing required key: {key}")
-
-        props = schema.get("properties", {})
-        for key, prop_schema in props.items():
-            if key not in obj:
-                continue
-            expected_type = prop_schema.get("type")
-            if isinstance(expected_type, str) and not _type_matches(obj[key], expected_type):
-                errors.append(
-                    f"Key '{key}' expected type {expected_type}, got {type(obj[key]).__name__}"
-                )
-    return errors
+    hit = _VALIDATORS.get(id(schema))
+    if hit is not None and hit[0] is schema:
+        return hit[1](obj)
+    validator = compile_json_validator(schema)
+    if len(_VALIDATORS) >= _VALIDATORS_MAX:
+        _VALIDATORS.clear()
+    _VALIDATORS[id(schema)] = (schema, validator)
+    return validator(obj)
 
 
 def validate_reasoner_decision_dict(d: Any) -> Tuple[Optional[ReasonerDecision], List[str]]: